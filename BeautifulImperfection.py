@@ -7,21 +7,25 @@ import datetime
 import json
 from pygame import gfxdraw
 import copy
+import time
+import argparse
+import numpy as np
 
 # Import our classes
 from classes.Button import Button
 from classes.Element import Element
 from classes.FractalStructure import FractalStructure
+from classes.StructurePattern import StructurePattern
 from classes.KnobControl import KnobControl
+from classes.HarmonySolver import HarmonySolver
+from classes.DirtyRectRenderer import DirtyRectRenderer
+from classes.TextCache import text_cache
+from classes.ParticlePool import ParticlePool
+from classes.ScriptedInput import ScriptedInput
 
-# Initialize pygame
-pygame.init()
-pygame.mixer.init()  # Initialize the mixer for audio
-
-# Screen setup
+# Screen setup (the window, or an offscreen surface in headless mode, is created by init_game)
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Beautiful Imperfection")
+screen = None
 
 # Game states
 STATE_PLAYING = 0
@@ -31,9 +35,9 @@ STATE_HIGH_SCORE_DISPLAY = 3
 STATE_TUTORIAL = 4
 
 # Difficulty settings
-DIFFICULTY_EASY = 0
-DIFFICULTY_NORMAL = 1
-DIFFICULTY_HARD = 2
+DIFFICULTY_EASY = FractalStructure.DIFFICULTY_EASY
+DIFFICULTY_NORMAL = FractalStructure.DIFFICULTY_NORMAL
+DIFFICULTY_HARD = FractalStructure.DIFFICULTY_HARD
 
 # Current game state
 game_state = STATE_PLAYING
@@ -43,14 +47,6 @@ current_difficulty = DIFFICULTY_NORMAL
 player_score = 0
 level_bonuses = []
 
-# Create assets directories if they don't exist
-if not os.path.exists('assets/Images'):
-    os.makedirs('assets/Images', exist_ok=True)
-if not os.path.exists('assets/Sounds'):
-    os.makedirs('assets/Sounds', exist_ok=True)
-if not os.path.exists('assets/Music'):
-    os.makedirs('assets/Music', exist_ok=True)
-
 # Function to check if all required music files are present
 def check_music_files():
     """Check if all required music files (01-10) are present in the Music directory"""
@@ -79,9 +75,16 @@ def check_music_files():
 
     return len(missing_tracks) == 0
 
+# Last volume passed to pygame.mixer.music.set_volume by adjust_music_to_harmony
+music_volume = None
+
 # Function to load and play level-specific music
 def load_level_music(level):
     """Load and play music based on the current level"""
+    global music_volume
+    if not audio_enabled:
+        return False
+
     # For levels 1-10, play the corresponding track
     # For levels > 10, cycle through tracks 1-10
     music_level = ((level - 1) % 10) + 1
@@ -101,6 +104,7 @@ def load_level_music(level):
             # Load and play the music
             pygame.mixer.music.load(music_path)
             pygame.mixer.music.set_volume(0.5)  # Set volume to 50%
+            music_volume = None  # Let adjust_music_to_harmony set it again
             pygame.mixer.music.play(-1)  # -1 means loop indefinitely
             return True
         else:
@@ -122,107 +126,178 @@ sound_files = {
     'error': 'assets/Sounds/error.wav'
 }
 
-# Create placeholder sounds
-for sound_name, sound_path in sound_files.items():
-    if not os.path.exists(sound_path):
-        try:
-            # Create a simple beep sound as placeholder
-            import wave
-            import struct
-
-            # Parameters for the sound
-            duration = 0.3  # seconds
-            frequency = 440  # Hz (A4)
-            volume = 0.5  # 0.0 to 1.0
-            fs = 44100  # sampling rate, Hz
-
-            # Adjust parameters based on sound type
-            if sound_name == 'level_complete':
-                frequency = 880  # Higher pitch for success
-                duration = 0.5
-            elif sound_name == 'game_over':
-                frequency = 220  # Lower pitch for failure
-                duration = 0.7
-            elif sound_name == 'high_score':
-                frequency = 660  # Happy sound
-                duration = 0.6
-            elif sound_name == 'button_click':
-                frequency = 440
-                duration = 0.1
-            elif sound_name == 'connect':
-                frequency = 550
-                duration = 0.2
-            elif sound_name == 'disconnect':
-                frequency = 330
-                duration = 0.2
-            elif sound_name == 'evolve':
-                frequency = 660
-                duration = 0.4
-            elif sound_name == 'error':
-                frequency = 220
-                duration = 0.3
-
-            # Generate samples
-            samples = []
-            for i in range(int(duration * fs)):
-                sample = volume * math.sin(2 * math.pi * frequency * i / fs)
-                samples.append(struct.pack('h', int(sample * 32767)))
-
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(sound_path), exist_ok=True)
-
-            # Write to file
-            with wave.open(sound_path, 'w') as f:
-                f.setnchannels(1)
-                f.setsampwidth(2)
-                f.setframerate(fs)
-                f.writeframes(b''.join(samples))
-
-            print(f"Created placeholder sound: {sound_path}")
-        except Exception as e:
-            print(f"Could not create sound file {sound_path}: {e}")
-
-# Load sounds
+def create_placeholder_sounds():
+    """Create a simple beep sound for every missing sound file"""
+    for sound_name, sound_path in sound_files.items():
+        if not os.path.exists(sound_path):
+            try:
+                # Create a simple beep sound as placeholder
+                import wave
+                import struct
+
+                # Parameters for the sound
+                duration = 0.3  # seconds
+                frequency = 440  # Hz (A4)
+                volume = 0.5  # 0.0 to 1.0
+                fs = 44100  # sampling rate, Hz
+
+                # Adjust parameters based on sound type
+                if sound_name == 'level_complete':
+                    frequency = 880  # Higher pitch for success
+                    duration = 0.5
+                elif sound_name == 'game_over':
+                    frequency = 220  # Lower pitch for failure
+                    duration = 0.7
+                elif sound_name == 'high_score':
+                    frequency = 660  # Happy sound
+                    duration = 0.6
+                elif sound_name == 'button_click':
+                    frequency = 440
+                    duration = 0.1
+                elif sound_name == 'connect':
+                    frequency = 550
+                    duration = 0.2
+                elif sound_name == 'disconnect':
+                    frequency = 330
+                    duration = 0.2
+                elif sound_name == 'evolve':
+                    frequency = 660
+                    duration = 0.4
+                elif sound_name == 'error':
+                    frequency = 220
+                    duration = 0.3
+
+                # Generate samples
+                samples = []
+                for i in range(int(duration * fs)):
+                    sample = volume * math.sin(2 * math.pi * frequency * i / fs)
+                    samples.append(struct.pack('h', int(sample * 32767)))
+
+                # Create directory if it doesn't exist
+                os.makedirs(os.path.dirname(sound_path), exist_ok=True)
+
+                # Write to file
+                with wave.open(sound_path, 'w') as f:
+                    f.setnchannels(1)
+                    f.setsampwidth(2)
+                    f.setframerate(fs)
+                    f.writeframes(b''.join(samples))
+
+                print(f"Created placeholder sound: {sound_path}")
+            except Exception as e:
+                print(f"Could not create sound file {sound_path}: {e}")
+
+class NullSound:
+    """Silent stand-in for pygame.mixer.Sound when there is no audio device"""
+
+    def play(self, *args, **kwargs):
+        pass
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+# Sound effects by name (filled by load_sounds)
 sounds = {}
-for sound_name, sound_path in sound_files.items():
+
+def load_sounds():
+    """Load every sound effect, falling back to silence"""
+    for sound_name, sound_path in sound_files.items():
+        try:
+            sounds[sound_name] = pygame.mixer.Sound(sound_path) if audio_enabled else NullSound()
+        except pygame.error as e:
+            print(f"Could not load sound {sound_path}: {e}")
+            # Create a silent sound as fallback
+            sounds[sound_name] = pygame.mixer.Sound(buffer=bytearray(44100))  # 1 second of silence
+
+def load_winning_balance_image():
+    """Load the winning balance image, creating a placeholder file first if it is missing"""
+    # Create a placeholder winning balance image if it doesn't exist
+    if not os.path.exists('assets/Images/winningBalance.jpg'):
+        # Create a simple placeholder image
+        placeholder = pygame.Surface((150, 150))
+        placeholder.fill((200, 200, 255))
+        pygame.draw.circle(placeholder, (255, 100, 100), (75, 75), 50)
+        pygame.draw.circle(placeholder, (100, 100, 255), (75, 75), 50, 5)
+        pygame.image.save(placeholder, 'assets/Images/winningBalance.jpg')
+
+    # Load the winning balance image
+    try:
+        winning_balance_img = pygame.image.load('assets/Images/winningBalance.jpg')
+        # Scale the image to 150x300
+        winning_balance_img = pygame.transform.scale(winning_balance_img, (150, 300)).convert()
+    except pygame.error:
+        # Create a fallback image if loading fails
+        winning_balance_img = pygame.Surface((150, 300))
+        winning_balance_img.fill((200, 200, 255))
+    return winning_balance_img
+
+# Winning balance image shown in the upper left corner (loaded by init_game)
+winning_balance_img = None
+
+def start_music():
+    """Start the level 1 music"""
+    # Try to load level 1 music initially
     try:
-        sounds[sound_name] = pygame.mixer.Sound(sound_path)
+        if not load_level_music(1):
+            # Fallback to a default music file if level-specific music fails
+            pygame.mixer.music.load('assets/Sounds/01_beautiful_imperfection.mp3')
+            pygame.mixer.music.set_volume(0.5)  # Set volume to 50%
+            pygame.mixer.music.play(-1)  # -1 means loop indefinitely
     except pygame.error as e:
-        print(f"Could not load sound {sound_path}: {e}")
-        # Create a silent sound as fallback
-        sounds[sound_name] = pygame.mixer.Sound(buffer=bytearray(44100))  # 1 second of silence
-
-# Create a placeholder winning balance image if it doesn't exist
-if not os.path.exists('assets/Images/winningBalance.jpg'):
-    # Create a simple placeholder image
-    placeholder = pygame.Surface((150, 150))
-    placeholder.fill((200, 200, 255))
-    pygame.draw.circle(placeholder, (255, 100, 100), (75, 75), 50)
-    pygame.draw.circle(placeholder, (100, 100, 255), (75, 75), 50, 5)
-    pygame.image.save(placeholder, 'assets/Images/winningBalance.jpg')
-
-# Check music files at startup
-check_music_files()
-
-# Try to load level 1 music initially
-try:
-    if not load_level_music(1):
-        # Fallback to a default music file if level-specific music fails
-        pygame.mixer.music.load('assets/Sounds/01_beautiful_imperfection.mp3')
-        pygame.mixer.music.set_volume(0.5)  # Set volume to 50%
-        pygame.mixer.music.play(-1)  # -1 means loop indefinitely
-except pygame.error as e:
-    print(f"Could not load or play background music: {e}")
-
-# Load the winning balance image
-try:
-    winning_balance_img = pygame.image.load('assets/Images/winningBalance.jpg')
-    # Scale the image to 150x300
-    winning_balance_img = pygame.transform.scale(winning_balance_img, (150, 300))
-except pygame.error:
-    # Create a fallback image if loading fails
-    winning_balance_img = pygame.Surface((150, 300))
-    winning_balance_img.fill((200, 200, 255))
+        print(f"Could not load or play background music: {e}")
+
+# False when running without an audio device (sounds are silent, music is skipped)
+audio_enabled = True
+
+def init_game(headless=False):
+    """Initialize pygame, create the screen and load assets
+
+    In headless mode SDL uses its dummy video and audio drivers, so the game
+    runs without a display or sound device and renders into an offscreen surface.
+    """
+    global screen, audio_enabled, winning_balance_img, font, title_font
+
+    if headless:
+        # Must be set before pygame initializes its video and audio subsystems
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+    # Initialize pygame
+    pygame.init()
+    try:
+        pygame.mixer.init()  # Initialize the mixer for audio
+        audio_enabled = True
+    except pygame.error as e:
+        print(f"No audio device, continuing without sound: {e}")
+        audio_enabled = False
+
+    # Screen setup
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Beautiful Imperfection")
+
+    # Create assets directories if they don't exist
+    if not os.path.exists('assets/Images'):
+        os.makedirs('assets/Images', exist_ok=True)
+    if not os.path.exists('assets/Sounds'):
+        os.makedirs('assets/Sounds', exist_ok=True)
+    if not os.path.exists('assets/Music'):
+        os.makedirs('assets/Music', exist_ok=True)
+
+    create_placeholder_sounds()
+    load_sounds()
+    winning_balance_img = load_winning_balance_image()
+
+    # Check music files at startup
+    check_music_files()
+    if audio_enabled:
+        start_music()
+
+    # Fonts
+    font = text_cache.font('Arial', 12)  # Reduced from 14 to 12
+    title_font = text_cache.font('Arial', 24, bold=True)
 
 # Colors
 WHITE = (255, 255, 255)
@@ -235,6 +310,47 @@ GRAY = (200, 200, 200)
 GREEN = (0, 128, 0)
 BACKGROUND = (255, 255, 255)  # Base white background
 BACKGROUND_OVERLAY = (255, 150, 0, 50)  # Orange with 10% opacity (26 out of 255)
+DIM_OVERLAY = (0, 0, 0, 128)  # Black with 50% transparency (game over and high score entry)
+DARK_OVERLAY = (0, 0, 0, 180)  # Black with 70% transparency (tutorial and high scores)
+
+# Pre-composed static layers, keyed by name and screen size
+static_layers = {}
+
+def get_static_layer(name, build):
+    """Return a cached layer, building it with build(size) on first use or after the screen is resized"""
+    size = screen.get_size()
+    layer = static_layers.get(name)
+    if layer is None or layer[0] != size:
+        layer = (size, build(size))
+        static_layers[name] = layer
+    return layer[1]
+
+def build_background(size):
+    """White background with the orange tint and the winning balance image, in display format"""
+    background = pygame.Surface(size).convert()
+    background.fill(BACKGROUND)
+    tint = pygame.Surface(size, pygame.SRCALPHA)
+    tint.fill(BACKGROUND_OVERLAY)
+    background.blit(tint, (0, 0))
+
+    # Winning balance image in the upper left corner
+    background.blit(winning_balance_img, (10, 10))
+    return background
+
+def build_overlay(color):
+    """Return a builder for a full-screen translucent overlay of the given color"""
+    def build(size):
+        overlay = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        overlay.fill(color)
+        return overlay
+    return build
+
+def build_target_box(size):
+    """Background and border of the target box at the top of the screen"""
+    box = pygame.Surface((300, 70)).convert()
+    box.fill((240, 240, 240))
+    pygame.draw.rect(box, BLACK, box.get_rect(), 2)
+    return box
 
 def draw_hint_box(surface, hint_text, score):
     """Draw a hint box at the bottom of the screen with hint text and score"""
@@ -248,50 +364,49 @@ def draw_hint_box(surface, hint_text, score):
     pygame.draw.rect(surface, BLACK, (box_x, box_y, box_width, box_height), 2)
 
     # Draw hint text on the left
-    hint_font = pygame.font.SysFont('Arial', 14)
-    hint_label = hint_font.render("Hint:", True, BLACK)
-    hint_content = hint_font.render(hint_text, True, BLACK)
+    hint_font = text_cache.font('Arial', 14)
+    hint_label = text_cache.render(hint_font, "Hint:", True, BLACK)
+    hint_content = text_cache.render(hint_font, hint_text, True, BLACK)
     surface.blit(hint_label, (box_x + 10, box_y + 10))
     surface.blit(hint_content, (box_x + 10, box_y + 30))
 
     # Draw score on the right
-    score_font = pygame.font.SysFont('Arial', 18, bold=True)
-    score_text = score_font.render(f"Score: {score:.1f}", True, PURPLE)
+    score_font = text_cache.font('Arial', 18, bold=True)
+    score_text = text_cache.render(score_font, f"Score: {score:.1f}", True, PURPLE)
     surface.blit(score_text, (box_x + box_width - score_text.get_width() - 20, box_y + box_height//2 - score_text.get_height()//2))
 
-# Fonts
-font = pygame.font.SysFont('Arial', 12)  # Reduced from 14 to 12
-title_font = pygame.font.SysFont('Arial', 24, bold=True)
+def draw_move_suggestions(surface, moves):
+    """Draw the highest-gain moves from FractalStructure.suggest_moves as an overlay"""
+    suggestion_font = text_cache.font('Arial', 12, bold=True)
+    for rank, (delta, action, element, argument) in enumerate(moves, 1):
+        if action == FractalStructure.ACTION_TOGGLE_CONNECTION:
+            # Show the proposed connection change as a line between the two elements
+            pygame.draw.line(surface, GREEN, (element.x, element.y), (argument.x, argument.y), 1)
+            label_x = (element.x + argument.x) / 2
+            label_y = (element.y + argument.y) / 2
+            name = "disconnect" if argument in element.connections else "connect"
+        else:
+            label_x = element.x + element.size // 2 + 4
+            label_y = element.y - element.size // 2 - 4
+            if action == FractalStructure.ACTION_ADJUST_LOVE_LOGIC:
+                name = "more love" if argument > 0 else "more logic"
+            elif action == FractalStructure.ACTION_EVOLVE:
+                name = "evolve"
+            elif action == FractalStructure.ACTION_CREATE_CHILD:
+                name = "child"
+            else:
+                name = "shape"
+
+        label = text_cache.render(suggestion_font, f"{rank}. {name} {delta:+.1f}%", True, GREEN)
+        surface.blit(label, (label_x, label_y))
+
+# Fonts (created by init_game once pygame is initialized)
+font = None
+title_font = None
 
 def calculate_target_from_slider(level, difficulty_value):
     """Calculate target harmony based on difficulty slider value (1-10)"""
-    # At difficulty ≤ 2, no target (0%)
-    if difficulty_value <= 2:
-        return 0
-
-    # At difficulty 2-4 (easy): 30-40% base
-    elif difficulty_value <= 4:
-        # Map 2-4 to 0-1
-        t = (difficulty_value - 2) / 2
-        base_target = 30 + t * 10
-        variation = (level % 3) * 2  # 0, 2, or 4 percent variation
-        return min(75, base_target + variation + (level - 1) * 3)
-
-    # At difficulty 5-8 (normal): 40-50% base
-    elif difficulty_value <= 8:
-        # Map 5-8 to 0-1
-        t = (difficulty_value - 5) / 3
-        base_target = 40 + t * 10
-        variation = (level % 3) * 3  # 0, 3, or 6 percent variation
-        return min(85, base_target + variation + (level - 1) * 4)
-
-    # At difficulty 9-10 (hard): 50-60% base
-    else:
-        # Map 9-10 to 0-1
-        t = (difficulty_value - 9)
-        base_target = 50 + t * 10
-        variation = (level % 3) * 5  # 0, 5, or 10 percent variation
-        return min(95, base_target + variation + (level - 1) * 5)
+    return FractalStructure.target_from_slider(level, difficulty_value)
 
 # Create high scores directory if it doesn't exist
 if not os.path.exists('high_scores'):
@@ -391,6 +506,7 @@ def save_game_state():
     # Save element data
     for i, e in enumerate(elements):
         element_data = {
+            'id': e.id,
             'x': e.x,
             'y': e.y,
             'size': e.size,
@@ -401,13 +517,9 @@ def save_game_state():
         }
         state['elements_data'].append(element_data)
 
-    # Save connections (as indices)
-    for i, e in enumerate(elements):
-        connections = []
-        for c in e.connections:
-            c_idx = elements.index(c)
-            connections.append(c_idx)
-        state['connections'].append(connections)
+    # Save connections (as element IDs)
+    for e in elements:
+        state['connections'].append([c.id for c in e.connections])
 
     return state
 
@@ -420,22 +532,25 @@ def restore_game_state(state):
     for data in state['elements_data']:
         e = Element(data['x'], data['y'], size=data['size'],
                    love_logic_ratio=data['love_logic_ratio'],
-                   level=data['level'], structure_pattern=data['structure_pattern'])
+                   level=data['level'], structure_pattern=data['structure_pattern'],
+                   element_id=data['id'])
         e.shape = data['shape']
         new_elements.append(e)
 
-    # Restore connections
-    for i, connections in enumerate(state['connections']):
-        for c_idx in connections:
-            new_elements[i].connections.append(new_elements[c_idx])
+    # Restore connections (the elements keep their IDs)
+    by_id = {e.id: e for e in new_elements}
+    for e, connections in zip(new_elements, state['connections']):
+        for c_id in connections:
+            e.connections.add(by_id[c_id])
 
     # Update elements list
     elements = new_elements
 
-    # Restore fractal structure
-    fractal.elements = elements
-    fractal.level = state['level']
-    fractal.harmony_score = state['harmony_score']
+    # Restore fractal structure (harmony is recomputed once when the batch exits)
+    with fractal.batch():
+        fractal.set_elements(elements)
+        fractal.level = state['level']
+        fractal.harmony_score = state['harmony_score']
 
     # Restore scores
     player_score = state['player_score']
@@ -452,18 +567,19 @@ def restart_game():
     # Reset game state
     game_state = STATE_PLAYING
     tutorial_step = 0
-    particles = []
+    particles.clear()
 
     # Reset fractal structure
     fractal = FractalStructure()
 
     # Create initial element for level 1
     initial_element = Element(WIDTH // 2, HEIGHT // 2, size=50, love_logic_ratio=random.uniform(0.2, 0.8))
-    initial_element.shape = random.randint(0, 9)  # Set random shape
+    initial_element.shape = Element.shapes.random_index()  # Set random shape
     elements = [initial_element]
 
-    for element in elements:
-        fractal.add_element(element)
+    with fractal.batch():
+        for element in elements:
+            fractal.add_element(element)
 
     # Play sound effect
     sounds['button_click'].play()
@@ -475,22 +591,7 @@ def restart_game():
 
 def calculate_level_target_for_difficulty(level, difficulty):
     """Calculate the target harmony score for the current level based on difficulty"""
-    # Base target calculation from FractalStructure
-    if difficulty == DIFFICULTY_EASY:
-        # Easier targets (30% start, slower progression)
-        base_target = 30 + 15 * (1 - (1 / (level + 1)))
-        variation = (level % 3) * 2  # 0, 2, or 4 percent variation
-        return min(75, base_target + variation)
-    elif difficulty == DIFFICULTY_NORMAL:
-        # Normal targets (40% start, medium progression)
-        base_target = 40 + 20 * (1 - (1 / (level + 0.5)))
-        variation = (level % 3) * 3  # 0, 3, or 6 percent variation
-        return min(85, base_target + variation)
-    else:  # DIFFICULTY_HARD
-        # Harder targets (50% start, faster progression)
-        base_target = 50 + 25 * (1 - (1 / level))
-        variation = (level % 3) * 5  # 0, 5, or 10 percent variation
-        return min(95, base_target + variation)
+    return FractalStructure.target_for_difficulty(level, difficulty)
 
 def show_tutorial(screen, step=0):
     """Display tutorial information based on the current step"""
@@ -550,9 +651,7 @@ def show_tutorial(screen, step=0):
     current_step = tutorial_steps[step]
 
     # Draw semi-transparent overlay
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 180))  # Black with 70% transparency
-    screen.blit(overlay, (0, 0))
+    screen.blit(get_static_layer('dark_overlay', build_overlay(DARK_OVERLAY)), (0, 0))
 
     # Draw tutorial box
     box_width, box_height = 600, 400
@@ -564,26 +663,26 @@ def show_tutorial(screen, step=0):
     pygame.draw.rect(screen, (0, 0, 0), (box_x, box_y, box_width, box_height), 2)
 
     # Draw title
-    title_font = pygame.font.SysFont('Arial', 28, bold=True)
-    title_text = title_font.render(current_step["title"], True, (0, 0, 0))
+    title_font = text_cache.font('Arial', 28, bold=True)
+    title_text = text_cache.render(title_font, current_step["title"], True, (0, 0, 0))
     screen.blit(title_text, (box_x + box_width // 2 - title_text.get_width() // 2, box_y + 30))
 
     # Draw content
-    content_font = pygame.font.SysFont('Arial', 18)
+    content_font = text_cache.font('Arial', 18)
     y_offset = box_y + 80
     for line in current_step["text"]:
-        text = content_font.render(line, True, (0, 0, 0))
+        text = text_cache.render(content_font, line, True, (0, 0, 0))
         screen.blit(text, (box_x + 50, y_offset))
         y_offset += 30
 
     # Draw progress indicator
-    progress_font = pygame.font.SysFont('Arial', 14)
-    progress_text = progress_font.render(f"Step {step + 1} of {len(tutorial_steps)}", True, (100, 100, 100))
+    progress_font = text_cache.font('Arial', 14)
+    progress_text = text_cache.render(progress_font, f"Step {step + 1} of {len(tutorial_steps)}", True, (100, 100, 100))
     screen.blit(progress_text, (box_x + box_width // 2 - progress_text.get_width() // 2, box_y + box_height - 50))
 
     # Draw continue instruction
-    continue_font = pygame.font.SysFont('Arial', 16)
-    continue_text = continue_font.render("Press SPACE to continue", True, (0, 0, 0))
+    continue_font = text_cache.font('Arial', 16)
+    continue_text = text_cache.render(continue_font, "Press SPACE to continue", True, (0, 0, 0))
     screen.blit(continue_text, (box_x + box_width // 2 - continue_text.get_width() // 2, box_y + box_height - 30))
 
     return step
@@ -591,9 +690,7 @@ def show_tutorial(screen, step=0):
 def show_high_scores(screen):
     """Display the high scores screen"""
     # Draw semi-transparent overlay
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 180))  # Black with 70% transparency
-    screen.blit(overlay, (0, 0))
+    screen.blit(get_static_layer('dark_overlay', build_overlay(DARK_OVERLAY)), (0, 0))
 
     # Draw high scores box
     box_width, box_height = 600, 500
@@ -605,17 +702,17 @@ def show_high_scores(screen):
     pygame.draw.rect(screen, (0, 0, 0), (box_x, box_y, box_width, box_height), 2)
 
     # Draw title
-    title_font = pygame.font.SysFont('Arial', 32, bold=True)
-    title_text = title_font.render("HIGH SCORES", True, (0, 0, 0))
+    title_font = text_cache.font('Arial', 32, bold=True)
+    title_text = text_cache.render(title_font, "HIGH SCORES", True, (0, 0, 0))
     screen.blit(title_text, (box_x + box_width // 2 - title_text.get_width() // 2, box_y + 20))
 
     # Draw column headers
-    header_font = pygame.font.SysFont('Arial', 18, bold=True)
-    rank_text = header_font.render("Rank", True, (0, 0, 0))
-    name_text = header_font.render("Name", True, (0, 0, 0))
-    score_text = header_font.render("Score", True, (0, 0, 0))
-    level_text = header_font.render("Level", True, (0, 0, 0))
-    date_text = header_font.render("Date", True, (0, 0, 0))
+    header_font = text_cache.font('Arial', 18, bold=True)
+    rank_text = text_cache.render(header_font, "Rank", True, (0, 0, 0))
+    name_text = text_cache.render(header_font, "Name", True, (0, 0, 0))
+    score_text = text_cache.render(header_font, "Score", True, (0, 0, 0))
+    level_text = text_cache.render(header_font, "Level", True, (0, 0, 0))
+    date_text = text_cache.render(header_font, "Date", True, (0, 0, 0))
 
     # Column positions
     rank_x = box_x + 30
@@ -638,7 +735,7 @@ def show_high_scores(screen):
     sorted_scores = sorted(high_scores, key=lambda x: x["score"], reverse=True)
 
     # Draw scores
-    score_font = pygame.font.SysFont('Arial', 16)
+    score_font = text_cache.font('Arial', 16)
     y_offset = box_y + 120
     for i, score in enumerate(sorted_scores[:10]):  # Show top 10
         # Highlight current player's score
@@ -646,98 +743,53 @@ def show_high_scores(screen):
             pygame.draw.rect(screen, (255, 255, 200), (box_x + 20, y_offset - 5, box_width - 40, 30))
 
         # Draw rank
-        rank_text = score_font.render(f"{i+1}", True, (0, 0, 0))
+        rank_text = text_cache.render(score_font, f"{i+1}", True, (0, 0, 0))
         screen.blit(rank_text, (rank_x, y_offset))
 
         # Draw name (truncate if too long)
         name = score["name"]
         if len(name) > 12:
             name = name[:10] + "..."
-        name_text = score_font.render(name, True, (0, 0, 0))
+        name_text = text_cache.render(score_font, name, True, (0, 0, 0))
         screen.blit(name_text, (name_x, y_offset))
 
         # Draw score
-        score_text = score_font.render(f"{score['score']:.1f}", True, (0, 0, 0))
+        score_text = text_cache.render(score_font, f"{score['score']:.1f}", True, (0, 0, 0))
         screen.blit(score_text, (score_x, y_offset))
 
         # Draw level
-        level_text = score_font.render(f"{score['level']}", True, (0, 0, 0))
+        level_text = text_cache.render(score_font, f"{score['level']}", True, (0, 0, 0))
         screen.blit(level_text, (level_x, y_offset))
 
         # Draw date
-        date_text = score_font.render(f"{score['date']}", True, (0, 0, 0))
+        date_text = text_cache.render(score_font, f"{score['date']}", True, (0, 0, 0))
         screen.blit(date_text, (date_x, y_offset))
 
         y_offset += 30
 
     # Draw back instruction
-    back_font = pygame.font.SysFont('Arial', 18)
-    back_text = back_font.render("Press ESCAPE to exit", True, (0, 0, 0))
+    back_font = text_cache.font('Arial', 18)
+    back_text = text_cache.render(back_font, "Press ESCAPE to exit", True, (0, 0, 0))
     screen.blit(back_text, (box_x + box_width // 2 - back_text.get_width() // 2, box_y + box_height - 40))
 
 def create_particle_effect(x, y, color, count=20, speed=3, size_range=(2, 6), duration=30):
-    """Create a particle effect at the given position"""
-    particles = []
-    for _ in range(count):
-        angle = random.uniform(0, 2 * math.pi)
-        speed_val = random.uniform(1, speed)
-        size = random.randint(size_range[0], size_range[1])
-        life = random.randint(duration // 2, duration)
-        particles.append({
-            'x': x,
-            'y': y,
-            'dx': math.cos(angle) * speed_val,
-            'dy': math.sin(angle) * speed_val,
-            'size': size,
-            'color': color,
-            'life': life,
-            'max_life': life
-        })
-    return particles
+    """Create a particle effect at the given position (a batch for particles.extend)"""
+    return ParticlePool.burst(x, y, color, count, speed, size_range, duration)
 
 def update_particles(particles):
     """Update particle positions and lifetimes"""
-    active_particles = []
-    for p in particles:
-        p['x'] += p['dx']
-        p['y'] += p['dy']
-        p['life'] -= 1
-
-        # Keep particle if still alive
-        if p['life'] > 0:
-            active_particles.append(p)
-
-    return active_particles
+    particles.update()
+    return particles
 
 def draw_particles(surface, particles):
     """Draw particles on the surface"""
-    for p in particles:
-        # Calculate alpha based on remaining life
-        alpha = int(255 * (p['life'] / p['max_life']))
+    particles.draw(surface)
 
-        # Create a surface with per-pixel alpha
-        s = pygame.Surface((p['size'] * 2, p['size'] * 2), pygame.SRCALPHA)
-
-        # Draw the particle with alpha
-        color_with_alpha = p['color'] + (alpha,)
-        pygame.draw.circle(s, color_with_alpha, (p['size'], p['size']), p['size'])
-
-        # Blit to main surface
-        surface.blit(s, (int(p['x'] - p['size']), int(p['y'] - p['size'])))
 def create_next_level():
     global elements, fractal, player_score, particles
 
-    # Create a more comprehensive structure pattern that captures all properties
-    structure_pattern = {
-        'positions': [(e.x, e.y) for e in elements],
-        'connections': [(elements.index(e),
-                        [elements.index(c) for c in e.connections])
-                        for e in elements],
-        'colors': [e.color for e in elements],
-        'shapes': [e.shape for e in elements],
-        'levels': [e.level for e in elements],
-        'love_logic_ratios': [e.love_logic_ratio for e in elements]
-    }
+    # Capture the structure with all its properties as an immutable pattern shared by the new elements
+    structure_pattern = StructurePattern.from_elements(elements)
 
     # Save the current level's image before advancing
     saved_file = fractal.save_image()
@@ -783,16 +835,6 @@ def create_next_level():
         # Make elements half the size for levels > 1
         element_size = 25  # Half of the original 50 size
 
-        # For single elements, make sure the structure pattern is properly set up
-        # This ensures changes to shape, color, and evolution are visible
-        if len(structure_pattern['positions']) == 1:
-            # Get the properties from the original element
-            original_element = fractal.previous_structure['elements'][0]
-            structure_pattern['shapes'] = [original_element.shape]
-            structure_pattern['colors'] = [original_element.color]
-            structure_pattern['levels'] = [original_element.level]
-            structure_pattern['love_logic_ratios'] = [original_element.love_logic_ratio]
-
         # Create two elements with the previous level's structure
         element1 = Element(WIDTH//2 - fixed_distance/2, HEIGHT//2, size=element_size,
                            love_logic_ratio=0.6, level=2, structure_pattern=structure_pattern)  # More love (greener)
@@ -812,10 +854,6 @@ def create_next_level():
         elements.append(element1)
         elements.append(element2)
 
-        # Add to fractal structure
-        fractal.add_element(element1)
-        fractal.add_element(element2)
-
         # No initial connection between elements
         # Players will need to create their own connections
     else:
@@ -898,7 +936,6 @@ def create_next_level():
                 element.shape = fractal.previous_structure['elements'][prev_idx].shape
 
             elements.append(element)
-            fractal.add_element(element)
 
         # Print information about the placement approach
         print(f"Level {new_level} - Love/Logic Ratio: {avg_love_logic:.2f} - Organic Factor: {organic_factor:.2f}")
@@ -906,6 +943,11 @@ def create_next_level():
         # No initial connections between elements
         # Players will need to create their own connections
 
+    # Add the new elements to the fractal structure with a single harmony recomputation
+    with fractal.batch():
+        for element in elements:
+            fractal.add_element(element)
+
     return new_level
 
 # Create complete button (moved to top right)
@@ -913,64 +955,197 @@ complete_button = Button(WIDTH - 150, 40, 120, 40, "COMPLETE", GREEN, (100, 200,
 
 # Create initial element for level 1 (just one element)
 initial_element = Element(WIDTH // 2, HEIGHT // 2, size=50, love_logic_ratio=random.uniform(0.2, 0.8))
-initial_element.shape = random.randint(0, 9)  # Set random shape
+initial_element.shape = Element.shapes.random_index()  # Set random shape
 elements = [initial_element]
 
 for element in elements:
     fractal.add_element(element)
 
-# Initialize particles list
-particles = []
+# Initialize particle pool
+particles = ParticlePool()
+def dash_segments(lines, dash_length=10):
+    """Split lines ((x1, y1), (x2, y2)) into their visible dashes in one vectorized pass
+
+    Returns an (N, 4) array of dash start and end points; dashes alternate on and
+    off every dash_length pixels, starting with a dash at each line's start.
+    """
+    if not lines:
+        return np.zeros((0, 4))
+    points = np.asarray(lines, dtype=float).reshape(-1, 4)
+    start, delta = points[:, :2], points[:, 2:] - points[:, :2]
+    distance = np.maximum(1, np.hypot(delta[:, 0], delta[:, 1]))
+    direction = delta / distance[:, None]
+
+    # Dashes are the even segments of length dash_length along each line
+    dashes = np.ceil(np.ceil(distance / dash_length) / 2).astype(int)
+    line = np.repeat(np.arange(len(points)), dashes)
+    first = np.cumsum(dashes) - dashes
+    offset = 2 * dash_length * (np.arange(len(line)) - first[line])
+    end_offset = np.minimum(offset + dash_length, distance[line])
+
+    dash_start = start[line] + direction[line] * offset[:, None]
+    dash_end = start[line] + direction[line] * end_offset[:, None]
+    return np.hstack((dash_start, dash_end))
+
+def dash_pixels(lines, width=1, dash_length=10):
+    """Return the pixels covered by the dashes of lines as (xs, ys) integer arrays
+
+    Every dash is sampled once per pixel along its longer axis and thickened
+    across it, all in one vectorized pass.
+    """
+    # End points are truncated to whole pixels first, as pygame.draw.line does
+    x1, y1, x2, y2 = np.floor(dash_segments(lines, dash_length)).T
+    dx, dy = x2 - x1, y2 - y1
+    steps = np.maximum(np.abs(dx), np.abs(dy)).astype(int) + 1
+    segment = np.repeat(np.arange(len(steps)), steps)
+    first = np.cumsum(steps) - steps
+    t = (np.arange(len(segment)) - first[segment]) / np.maximum(1, steps - 1)[segment]
+    xs = np.floor(x1[segment] + dx[segment] * t + 0.5).astype(int)
+    ys = np.floor(y1[segment] + dy[segment] * t + 0.5).astype(int)
+
+    if width > 1:
+        # Mostly horizontal dashes grow downwards, mostly vertical ones sideways
+        x_major = (np.abs(dx) >= np.abs(dy))[segment]
+        offsets = np.arange(width)[:, None] - (width - 1) // 2
+        xs = (xs + offsets * ~x_major).ravel()
+        ys = (ys + offsets * x_major).ravel()
+    return xs, ys
+
+def draw_dashed_lines(surface, lines, color, width=1, dash_length=10):
+    """Draw many dashed lines at once, written straight into the surface's pixels in one pass"""
+    xs, ys = dash_pixels(lines, width, dash_length)
+    clip = surface.get_clip()
+    inside = (xs >= clip.left) & (xs < clip.right) & (ys >= clip.top) & (ys < clip.bottom)
+    if not inside.any():
+        return
+    xs, ys = xs[inside], ys[inside]
+    if surface.get_bytesize() == 3:
+        pixels = pygame.surfarray.pixels3d(surface)
+        pixels[xs, ys] = color[:3]
+    else:
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[xs, ys] = surface.map_rgb(color)
+    del pixels  # Unlocks the surface
+
 def draw_dotted_line(surface, start_pos, end_pos, color, width=1, dash_length=10):
     """Draw a dotted line between two points"""
-    x1, y1 = start_pos
-    x2, y2 = end_pos
-
-    # Calculate line length and angle
-    dx = x2 - x1
-    dy = y2 - y1
-    distance = max(1, math.sqrt(dx*dx + dy*dy))
-
-    # Normalize direction vector
-    dx /= distance
-    dy /= distance
-
-    # Draw the dotted line
-    pos = [x1, y1]
-    dash_on = True
-    drawn = 0
-
-    while drawn < distance:
-        # Calculate how much to draw in this segment
-        segment_length = min(dash_length, distance - drawn)
-
-        # Calculate end point of this segment
-        end = [pos[0] + dx * segment_length, pos[1] + dy * segment_length]
-
-        # Draw the segment if dash is on
-        if dash_on:
-            pygame.draw.line(surface, color, pos, end, width)
-
-        # Update position and toggle dash state
-        pos = end
-        dash_on = not dash_on
-        drawn += segment_length
+    draw_dashed_lines(surface, [(start_pos, end_pos)], color, width, dash_length)
+
+# Cached connection hints for the selected element (see get_connection_hint_layer)
+HINT_COLOR = (100, 100, 100)
+HINT_COLORKEY = (255, 0, 255)
+connection_hints = {'key': None, 'layer': None, 'position': (0, 0)}
+
+def hint_lines(selected_element, targets):
+    """Return the dashed hint lines from the selected element to the targets it isn't connected to"""
+    return [((selected_element.x, selected_element.y), (element.x, element.y))
+            for element in targets if element not in selected_element.connections]
+
+def get_connection_hint_layer(selected_element, elements, structure):
+    """Return (layer, position) with the connection hints that stay put, or (None, (0, 0))
+
+    The layer covers just the rings around every other resting element and, unless
+    the selection is being dragged, the dashed lines to those it isn't connected to.
+    It is rebuilt only when the selection, a drag, the connections (structure.version)
+    or a resting element's position (structure.resting_layout_version) changes.
+    """
+    moving = tuple(element.id for element in elements if element.dragging)
+    key = (id(selected_element), moving, structure.version, structure.resting_layout_version, len(elements))
+    if connection_hints['key'] != key:
+        resting = [element for element in elements if element != selected_element and not element.dragging]
+        lines = [] if selected_element.dragging else hint_lines(selected_element, resting)
+
+        layer, position = None, (0, 0)
+        if resting:
+            # Bounds of the rings and the 2 pixel wide lines
+            left = min(min(e.x - e.size//2 - 4 for e in resting), selected_element.x - 2)
+            top = min(min(e.y - e.size//2 - 4 for e in resting), selected_element.y - 2)
+            right = max(max(e.x + e.size//2 + 4 for e in resting), selected_element.x + 2)
+            bottom = max(max(e.y + e.size//2 + 4 for e in resting), selected_element.y + 2)
+            left, top = int(left), int(top)
+
+            layer = pygame.Surface((int(right) - left + 1, int(bottom) - top + 1)).convert()
+            layer.fill(HINT_COLORKEY)
+            draw_dashed_lines(layer, [((x1 - left, y1 - top), (x2 - left, y2 - top))
+                                      for (x1, y1), (x2, y2) in lines], HINT_COLOR, 2, 5)
+
+            # Draw a small indicator around elements that can be connected to
+            for element in resting:
+                pygame.draw.circle(layer, HINT_COLOR, (element.x - left, element.y - top), element.size//2 + 3, 1)
+
+            # Only rebuilt when a click selects an element or a drag ends, never during a
+            # drag, so run-length encoding (slower to build, faster to blit) pays off
+            layer.set_colorkey(HINT_COLORKEY, pygame.RLEACCEL)
+            position = (left, top)
+
+        connection_hints['key'] = key
+        connection_hints['layer'] = layer
+        connection_hints['position'] = position
+    return connection_hints['layer'], connection_hints['position']
+
+def draw_connection_hints(surface, selected_element, elements, structure):
+    """Draw dashed lines to every unconnected element and a ring around every other element
+
+    The hints that stay put come from a cached layer; those of dragged elements
+    change every frame, so they are drawn straight onto the surface.
+    """
+    layer, position = get_connection_hint_layer(selected_element, elements, structure)
+    if layer is not None:
+        surface.blit(layer, position)
+
+    moving = [element for element in elements if element != selected_element and element.dragging]
+    targets = [element for element in elements if element != selected_element] if selected_element.dragging else moving
+    draw_dashed_lines(surface, hint_lines(selected_element, targets), HINT_COLOR, 2, 5)
+    for element in moving:
+        pygame.draw.circle(surface, HINT_COLOR, (element.x, element.y), element.size//2 + 3, 1)
 
 # Function to adjust music based on harmony score
 def adjust_music_to_harmony(harmony_score):
     """Adjust music volume based on harmony score"""
+    global music_volume
+    if not audio_enabled:
+        return
+
     # Scale volume between 0.3 (30%) and 1.0 (100%) based on harmony
     volume = 0.3 + (harmony_score / 100) * 0.7
-    pygame.mixer.music.set_volume(volume)
+
+    # Only talk to the mixer when the volume actually changes
+    if volume != music_volume:
+        pygame.mixer.music.set_volume(volume)
+        music_volume = volume
+
+# How long an idle frame waits for input before checking again
+IDLE_TIMEOUT_MS = 1000
 
 # Main game loop
-def main():
+def main(headless=False, script=None, max_frames=None, frame_dir=None, frame_every=1):
+    """Run the game
+
+    headless runs under the SDL dummy drivers as fast as possible, taking input
+    from script (a ScriptedInput) instead of the keyboard and mouse. The run ends
+    after max_frames frames, or once the script is used up; every frame_every-th
+    frame is saved to frame_dir. Headless runs return a summary dict.
+    """
     global elements, fractal, player_score, level_bonuses, game_state, tutorial_step, particles, current_difficulty
 
+    if screen is None:
+        init_game(headless)
+
     selected_element = None
+    dragged_element = None  # Element following the mouse, if any
     running = True
     clock = pygame.time.Clock()
 
+    # Headless bookkeeping
+    frame = 0
+    start_time = time.time()
+    if frame_dir:
+        os.makedirs(frame_dir, exist_ok=True)
+
+    # Only the parts of each frame that changed are pushed to the display
+    renderer = DirtyRectRenderer(screen)
+    frame_pending = True  # Draw at least once before idling
+
     # Music control variables
     music_playing = True
 
@@ -981,6 +1156,18 @@ def main():
     # Restart confirmation
     restart_confirmation = False
 
+    # Overlay with the best next moves (toggled with H)
+    show_move_suggestions = False
+
+    # Automatic solver (A starts a search, N plays the next move of the plan)
+    solver = HarmonySolver()
+    solver_future = None
+    solver_plan = []
+    solver_plan_version = None  # fractal.version the plan was computed for
+
+    # High-resolution export running in a background process (E key)
+    export_future = None
+
     # Tutorial state
     tutorial_step = 0
     show_tutorial_mode = True  # Show tutorial on first run
@@ -1009,15 +1196,32 @@ def main():
     #     game_state = STATE_TUTORIAL
 
     while running:
-        mouse_pos = pygame.mouse.get_pos()
+        # Idle mode: when nothing is moving, sleep until input (or a timer) arrives
+        # instead of redrawing an unchanged scene 60 times a second
+        events = pygame.event.get()
+        if script is not None:
+            events += script.events(frame)
+        animating = (len(particles) > 0 or difficulty_knob.active or solver_future is not None
+                     or export_future is not None or dragged_element is not None)
+        if not events and not animating and not frame_pending and not headless:
+            event = pygame.event.wait(IDLE_TIMEOUT_MS)
+            if event.type == pygame.NOEVENT:
+                continue  # Nothing happened - the last frame is still on screen
+            events = [event] + pygame.event.get()
+
+        mouse_pos = script.mouse_pos if script is not None else pygame.mouse.get_pos()
         mouse_clicked = False
         mouse_clicked_processed = False  # Track if a click was processed
 
         # Process events
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
 
+            # The window contents were lost (uncovered, restored or resized) - push the whole frame
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+                renderer.invalidate()
+
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     if game_state == STATE_HIGH_SCORE_DISPLAY or game_state == STATE_TUTORIAL:
@@ -1058,6 +1262,44 @@ def main():
                     else:
                         restart_game()
 
+                # Toggle move suggestions with H key (also while an element is selected)
+                elif event.key == pygame.K_h and game_state == STATE_PLAYING:
+                    show_move_suggestions = not show_move_suggestions
+                    print("Move suggestions " + ("shown" if show_move_suggestions else "hidden"))
+
+                # Start the automatic solver with A key (runs in a worker process)
+                elif event.key == pygame.K_a and game_state == STATE_PLAYING:
+                    if solver_future is None:
+                        target = calculate_target_from_slider(fractal.level, difficulty_knob.value)
+                        solver_future = solver.submit(fractal, target)
+                        solver_plan_version = fractal.version
+                        print(f"Solving for {target:.1f}% harmony...")
+
+                # Play the next solver move with N key
+                elif event.key == pygame.K_n and game_state == STATE_PLAYING:
+                    if solver_plan:
+                        undo_history.append(save_game_state())
+                        if len(undo_history) > max_undo_history:
+                            undo_history.pop(0)  # Remove oldest state if we exceed max
+
+                        move = solver_plan.pop(0)
+                        print(f"Solver move: {HarmonySolver.describe_move(move)}")
+                        HarmonySolver.apply_move(fractal, elements, move)
+                        solver_plan_version = fractal.version
+                        sounds['button_click'].play()
+                    else:
+                        print("No solver moves to play")
+                        sounds['error'].play()
+
+                # Export a print-resolution (8K) image of the structure with E key (runs in the background)
+                elif event.key == pygame.K_e and game_state == STATE_PLAYING:
+                    if fractal.elements and export_future is None:
+                        export_future = fractal.submit_export(7680, 4320)
+                        print("Exporting high-resolution image...")
+                        sounds['button_click'].play()
+                    else:
+                        sounds['error'].play()
+
                 # Adjust love/logic ratio with up/down arrows
                 elif game_state == STATE_PLAYING and selected_element:
                     if event.key == pygame.K_UP:
@@ -1108,9 +1350,7 @@ def main():
                             undo_history.pop(0)  # Remove oldest state if we exceed max
 
                         new_shape = selected_element.change_shape()
-                        shape_names = ["Circle", "Square", "Star", "Hexagon", "Pentagon",
-                                      "Triangle", "Diamond", "Cross", "Heart", "Crescent"]
-                        print(f"Shape changed to {shape_names[new_shape]}")
+                        print(f"Shape changed to {Element.shapes.name(new_shape)}")
                         sounds['button_click'].play()
 
                     # Create child element with C key
@@ -1131,7 +1371,7 @@ def main():
                         ))
 
                 # Toggle music with M key
-                elif event.key == pygame.K_m:
+                elif event.key == pygame.K_m and audio_enabled:
                     if music_playing:
                         pygame.mixer.music.pause()
                         music_playing = False
@@ -1257,63 +1497,81 @@ def main():
                     sounds['button_click'].play()
                     continue
 
-                # Check if an element was clicked
-                clicked_on_element = False
-                for element in elements:
-                    if element.is_over(mouse_pos):
-                        clicked_on_element = True
-
-                        # If we already have a selected element and it's different from this one,
-                        # create a connection between them
-                        if selected_element and selected_element != element:
-                            # Save state before making changes for undo
-                            undo_history.append(save_game_state())
-                            if len(undo_history) > max_undo_history:
-                                undo_history.pop(0)  # Remove oldest state if we exceed max
-
-                            # Check if they're already connected
-                            if element not in selected_element.connections:
-                                selected_element.connect_to(element)
-                                print(f"Connected elements")
-                                fractal.calculate_harmony()
-                                sounds['connect'].play()
-                                # Create particle effect for connection
-                                mid_x = (selected_element.x + element.x) / 2
-                                mid_y = (selected_element.y + element.y) / 2
-                                particles.extend(create_particle_effect(
-                                    mid_x, mid_y,
-                                    PURPLE, count=5, speed=1,
-                                    size_range=(2, 4), duration=15
-                                ))
-                            else:
-                                # Remove connection if it already exists
-                                selected_element.connections.remove(element)
-                                element.connections.remove(selected_element)
-                                print(f"Disconnected elements")
-                                fractal.calculate_harmony()
-                                sounds['disconnect'].play()
-
-                        # Set this as the selected element
-                        selected_element = element
-                        element.start_drag()
-                        break
-
-                # If clicked on empty space, deselect current element
-                if not clicked_on_element:
+                # Check if an element was clicked (looked up in the structure's spatial grid)
+                element = fractal.element_at(mouse_pos)
+                if element is not None:
+                    # If we already have a selected element and it's different from this one,
+                    # create a connection between them
+                    if selected_element and selected_element != element:
+                        # Save state before making changes for undo
+                        undo_history.append(save_game_state())
+                        if len(undo_history) > max_undo_history:
+                            undo_history.pop(0)  # Remove oldest state if we exceed max
+
+                        # Check if they're already connected
+                        if element not in selected_element.connections:
+                            selected_element.connect_to(element)
+                            print(f"Connected elements")
+                            fractal.calculate_harmony()
+                            sounds['connect'].play()
+                            # Create particle effect for connection
+                            mid_x = (selected_element.x + element.x) / 2
+                            mid_y = (selected_element.y + element.y) / 2
+                            particles.extend(create_particle_effect(
+                                mid_x, mid_y,
+                                PURPLE, count=5, speed=1,
+                                size_range=(2, 4), duration=15
+                            ))
+                        else:
+                            # Remove connection if it already exists
+                            selected_element.disconnect_from(element)
+                            print(f"Disconnected elements")
+                            fractal.calculate_harmony()
+                            sounds['disconnect'].play()
+
+                    # Set this as the selected element
+                    selected_element = element
+                    element.start_drag()
+                    dragged_element = element
+                else:
+                    # Clicked on empty space, deselect current element
                     selected_element = None
 
             elif event.type == pygame.MOUSEBUTTONUP:
-                # End dragging for all elements
-                for element in elements:
-                    element.end_drag()
+                # End dragging
+                if dragged_element is not None:
+                    dragged_element.end_drag()
+                    dragged_element = None
+
+        # Collect the solver result once the worker process is done
+        if solver_future is not None and solver_future.done():
+            result = solver_future.result()
+            solver_future = None
+            if fractal.version == solver_plan_version:
+                solver_plan = result['moves']
+                status = "target reached" if result['reached'] else "closest to target"
+                print(f"Solver plan: {len(solver_plan)} moves, {result['harmony']:.1f}% ({status})")
+            else:
+                print("Structure changed while solving - press A to solve again")
+
+        # Report the high-resolution export once its process is done
+        if export_future is not None and export_future.done():
+            try:
+                print(f"Exported high-resolution image: {export_future.result()}")
+            except Exception as error:
+                print(f"High-resolution export failed: {error}")
+            export_future = None
+
+        # Drop the plan as soon as the structure changes in any other way
+        if solver_plan and fractal.version != solver_plan_version:
+            solver_plan = []
 
         # Update particles
         particles = update_particles(particles)
 
-        # Update elements if in playing state
-        if game_state == STATE_PLAYING:
-            for element in elements:
-                element.update_position(mouse_pos)
+        # Move the dragged element if in playing state
+        if game_state == STATE_PLAYING and dragged_element is not None:
+            dragged_element.update_position(mouse_pos)
 
         # Update buttons
         if game_state == STATE_PLAYING:
@@ -1362,18 +1620,12 @@ def main():
         # Adjust music volume based on harmony score
         adjust_music_to_harmony(fractal.harmony_score)
 
-        # Draw everything
-        screen.fill(BACKGROUND)  # Fill with base white background
-
-        # Create a semi-transparent orange overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill(BACKGROUND_OVERLAY)  # Orange with 10% opacity
-        screen.blit(overlay, (0, 0))
-
-        # Draw winning balance image in the upper left corner
-        screen.blit(winning_balance_img, (10, 10))
+        # Draw everything, starting from the pre-composed background
+        # (white fill, orange tint and the winning balance image in the upper left corner)
+        screen.blit(get_static_layer('background', build_background), (0, 0))
 
-        # Draw elements
+        # Draw connections (each edge once, behind all elements), then the elements
+        fractal.draw_connections(screen)
         for element in elements:
             element.draw(screen)
 
@@ -1389,21 +1641,20 @@ def main():
             # Display the love/logic ratio of the selected element
             love_percent = int(selected_element.love_logic_ratio * 100)
             logic_percent = 100 - love_percent
-            ratio_text = font.render(f"Love: {love_percent}% | Logic: {logic_percent}%", True, BLACK)
+            ratio_text = text_cache.render(font, f"Love: {love_percent}% | Logic: {logic_percent}%", True, BLACK)
             screen.blit(ratio_text, (WIDTH // 2, 30))
 
-            # Draw connection hint for all other elements
-            for element in elements:
-                if element != selected_element:
-                    # Draw a dotted line to show potential connection
-                    if element not in selected_element.connections:
-                        # Draw dotted line to show potential connection
-                        draw_dotted_line(screen, (selected_element.x, selected_element.y),
-                                        (element.x, element.y), (100, 100, 100), 2, 5)
+            # Draw connection hints for all other elements (the resting ones cached until something reconnects)
+            draw_connection_hints(screen, selected_element, elements, fractal)
 
-                    # Draw a small indicator around elements that can be connected to
-                    pygame.draw.circle(screen, (100, 100, 100), (element.x, element.y),
-                                      element.size//2 + 3, 1)
+        # Draw the best next moves if requested
+        if show_move_suggestions and game_state == STATE_PLAYING:
+            draw_move_suggestions(screen, fractal.suggest_moves(3))
+
+        # Highlight the next solver move
+        if solver_plan and game_state == STATE_PLAYING:
+            action, element, argument = HarmonySolver.resolve_move(fractal, solver_plan[0])
+            draw_move_suggestions(screen, [(fractal.harmony_delta(action, element, argument), action, element, argument)])
 
         # Calculate target based on difficulty knob
         target = calculate_target_from_slider(fractal.level, difficulty_knob.value)
@@ -1418,25 +1669,24 @@ def main():
         target_box_y = 20
 
         # Draw target box background
-        pygame.draw.rect(screen, (240, 240, 240), (target_box_x, target_box_y, target_box_width, target_box_height))
-        pygame.draw.rect(screen, BLACK, (target_box_x, target_box_y, target_box_width, target_box_height), 2)
+        screen.blit(get_static_layer('target_box', build_target_box), (target_box_x, target_box_y))
 
         # Draw level and target information
-        level_font = pygame.font.SysFont('Arial', 18, bold=True)
-        level_text = level_font.render(
+        level_font = text_cache.font('Arial', 18, bold=True)
+        level_text = text_cache.render(level_font, 
             f"Level {fractal.level}", True, BLACK)
         screen.blit(level_text, (target_box_x + 10, target_box_y + 10))
 
         # Draw target percentage
-        target_font = pygame.font.SysFont('Arial', 12)
+        target_font = text_cache.font('Arial', 12)
         if difficulty_knob.value <= 2:
-            target_text = target_font.render("No Target", True, (100, 100, 100))
+            target_text = text_cache.render(target_font, "No Target", True, (100, 100, 100))
         else:
-            target_text = target_font.render(f"Target: {target:.1f}%", True, (255, 0, 0))
+            target_text = text_cache.render(target_font, f"Target: {target:.1f}%", True, (255, 0, 0))
         screen.blit(target_text, (target_box_x + target_box_width - 100, target_box_y + 10))
 
         # Draw current harmony
-        harmony_text = target_font.render(f"Current: {fractal.harmony_score:.1f}%", True, (0, 0, 255))
+        harmony_text = text_cache.render(target_font, f"Current: {fractal.harmony_score:.1f}%", True, (0, 0, 255))
         screen.blit(harmony_text, (target_box_x +
                     target_box_width - 100, target_box_y + 30))
 
@@ -1486,7 +1736,10 @@ def main():
         complete_button.draw(screen)
 
         # Draw hint box at the bottom with hint and score
-        hint = fractal.get_strategic_hint()
+        if solver_plan:
+            hint = f"Solver ({len(solver_plan)} moves left, N to play): {HarmonySolver.describe_move(solver_plan[0])}"
+        else:
+            hint = fractal.get_strategic_hint()
         draw_hint_box(screen, hint, player_score)
 
         # Draw high scores button
@@ -1500,62 +1753,58 @@ def main():
 
         # Remove instructions section (as requested)
         # Draw score
-        score_text = title_font.render(f"Score: {player_score:.1f}", True, PURPLE)
+        score_text = text_cache.render(title_font, f"Score: {player_score:.1f}", True, PURPLE)
         # Score is now displayed in the hint box
         # screen.blit(score_text, (WIDTH - 150, HEIGHT - 100))
 
         # Draw game over screen if game is over
         if game_state == STATE_GAME_OVER:
             # Draw semi-transparent overlay
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 128))  # Black with 50% transparency
-            screen.blit(overlay, (0, 0))
+            screen.blit(get_static_layer('dim_overlay', build_overlay(DIM_OVERLAY)), (0, 0))
 
             # Draw game over message
-            game_over_font = pygame.font.SysFont('Arial', 48, bold=True)
-            game_over_text = game_over_font.render("GAME OVER", True, (255, 0, 0))
+            game_over_font = text_cache.font('Arial', 48, bold=True)
+            game_over_text = text_cache.render(game_over_font, "GAME OVER", True, (255, 0, 0))
             screen.blit(game_over_text, (WIDTH//2 - game_over_text.get_width()//2, HEIGHT//2 - 100))
 
             # Draw reason
-            reason_font = pygame.font.SysFont('Arial', 24)
-            reason_text = reason_font.render(game_over_reason, True, WHITE)
+            reason_font = text_cache.font('Arial', 24)
+            reason_text = text_cache.render(reason_font, game_over_reason, True, WHITE)
             screen.blit(reason_text, (WIDTH//2 - reason_text.get_width()//2, HEIGHT//2 - 40))
 
             # Draw final score
-            final_score_font = pygame.font.SysFont('Arial', 36)
-            final_score_text = final_score_font.render(f"Final Score: {player_score:.1f}", True, (255, 255, 0))
+            final_score_font = text_cache.font('Arial', 36)
+            final_score_text = text_cache.render(final_score_font, f"Final Score: {player_score:.1f}", True, (255, 255, 0))
             screen.blit(final_score_text, (WIDTH//2 - final_score_text.get_width()//2, HEIGHT//2 + 20))
 
             # Draw level reached
-            level_font = pygame.font.SysFont('Arial', 24)
-            level_text = level_font.render(f"Level Reached: {fractal.level}", True, WHITE)
+            level_font = text_cache.font('Arial', 24)
+            level_text = text_cache.render(level_font, f"Level Reached: {fractal.level}", True, WHITE)
             screen.blit(level_text, (WIDTH//2 - level_text.get_width()//2, HEIGHT//2 + 70))
 
             # Draw continue message
-            continue_font = pygame.font.SysFont('Arial', 18)
-            continue_text = continue_font.render("Press any key to continue", True, WHITE)
+            continue_font = text_cache.font('Arial', 18)
+            continue_text = text_cache.render(continue_font, "Press any key to continue", True, WHITE)
             screen.blit(continue_text, (WIDTH//2 - continue_text.get_width()//2, HEIGHT//2 + 120))
 
         # Draw high score entry screen
         elif game_state == STATE_HIGH_SCORE_ENTRY:
             # Draw semi-transparent overlay
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 128))  # Black with 50% transparency
-            screen.blit(overlay, (0, 0))
+            screen.blit(get_static_layer('dim_overlay', build_overlay(DIM_OVERLAY)), (0, 0))
 
             # Draw high score message
-            hs_font = pygame.font.SysFont('Arial', 36, bold=True)
-            hs_text = hs_font.render("NEW HIGH SCORE!", True, (255, 215, 0))  # Gold color
+            hs_font = text_cache.font('Arial', 36, bold=True)
+            hs_text = text_cache.render(hs_font, "NEW HIGH SCORE!", True, (255, 215, 0))  # Gold color
             screen.blit(hs_text, (WIDTH//2 - hs_text.get_width()//2, HEIGHT//2 - 100))
 
             # Draw score
-            score_font = pygame.font.SysFont('Arial', 24)
-            score_text = score_font.render(f"Score: {player_score:.1f}", True, WHITE)
+            score_font = text_cache.font('Arial', 24)
+            score_text = text_cache.render(score_font, f"Score: {player_score:.1f}", True, WHITE)
             screen.blit(score_text, (WIDTH//2 - score_text.get_width()//2, HEIGHT//2 - 50))
 
             # Draw name entry field
-            name_font = pygame.font.SysFont('Arial', 24)
-            name_prompt = name_font.render("Enter your name:", True, WHITE)
+            name_font = text_cache.font('Arial', 24)
+            name_prompt = text_cache.render(name_font, "Enter your name:", True, WHITE)
             screen.blit(name_prompt, (WIDTH//2 - name_prompt.get_width()//2, HEIGHT//2))
 
             # Draw name input box
@@ -1564,12 +1813,12 @@ def main():
             pygame.draw.rect(screen, BLACK, name_box_rect, 2)
 
             # Draw entered name
-            name_text = name_font.render(high_score_name + "|", True, BLACK)
+            name_text = text_cache.render(name_font, high_score_name + "|", True, BLACK)
             screen.blit(name_text, (name_box_rect.x + 10, name_box_rect.y + 5))
 
             # Draw submit instruction
-            submit_font = pygame.font.SysFont('Arial', 18)
-            submit_text = submit_font.render("Press ENTER to submit", True, WHITE)
+            submit_font = text_cache.font('Arial', 18)
+            submit_text = text_cache.render(submit_font, "Press ENTER to submit", True, WHITE)
             screen.blit(submit_text, (WIDTH//2 - submit_text.get_width()//2, HEIGHT//2 + 100))
 
         # Draw high scores screen
@@ -1592,20 +1841,65 @@ def main():
             pygame.draw.rect(screen, BLACK, (dialog_x, dialog_y, dialog_width, dialog_height), 2)
 
             # Draw text
-            confirm_font = pygame.font.SysFont('Arial', 16)
-            confirm_text1 = confirm_font.render("Are you sure you want to restart?", True, BLACK)
-            confirm_text2 = confirm_font.render("Press R again to confirm, any other key to cancel", True, BLACK)
+            confirm_font = text_cache.font('Arial', 16)
+            confirm_text1 = text_cache.render(confirm_font, "Are you sure you want to restart?", True, BLACK)
+            confirm_text2 = text_cache.render(confirm_font, "Press R again to confirm, any other key to cancel", True, BLACK)
 
             screen.blit(confirm_text1, (dialog_x + dialog_width//2 - confirm_text1.get_width()//2, dialog_y + 30))
             screen.blit(confirm_text2, (dialog_x + dialog_width//2 - confirm_text2.get_width()//2, dialog_y + 60))
 
-        # Update display
-        pygame.display.flip()
-        clock.tick(60)
+        # Update the changed parts of the display
+        renderer.present()
+        frame_pending = False
+
+        if headless:
+            # Save the offscreen frame and stop when the run is complete
+            if frame_dir and frame % frame_every == 0:
+                pygame.image.save(screen, os.path.join(frame_dir, f"frame_{frame:05d}.png"))
+            frame += 1
+            if (max_frames is not None and frame >= max_frames) or \
+                    (max_frames is None and script is not None and script.finished()):
+                running = False
+        else:
+            clock.tick(60)
+
+    summary = None
+    if headless:
+        if frame_dir:
+            pygame.image.save(screen, os.path.join(frame_dir, "final.png"))
+        elapsed = time.time() - start_time
+        summary = {
+            'frames': frame,
+            'seconds': elapsed,
+            'fps': frame / elapsed if elapsed > 0 else 0,
+            'level': fractal.level,
+            'harmony': fractal.harmony_score,
+            'score': player_score
+        }
 
+    solver.shutdown()
     pygame.quit()
+    if headless:
+        return summary
     sys.exit()
 
 # Run the game
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Beautiful Imperfection")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without a window or sound device (SDL dummy drivers)")
+    parser.add_argument('--script', help="JSON file of scripted input (see classes/ScriptedInput.py)")
+    parser.add_argument('--frames', type=int, help="stop after this many frames")
+    parser.add_argument('--frame-dir', help="save rendered frames as PNG files in this directory")
+    parser.add_argument('--frame-every', type=int, default=1, help="save every Nth frame (default 1)")
+    args = parser.parse_args()
+
+    if args.headless:
+        if args.script is None and args.frames is None:
+            parser.error("--headless needs --script or --frames to know when to stop")
+        script = ScriptedInput.from_file(args.script) if args.script else None
+        summary = main(headless=True, script=script, max_frames=args.frames,
+                       frame_dir=args.frame_dir, frame_every=args.frame_every)
+        print(json.dumps(summary, indent=2))
+    else:
+        main()
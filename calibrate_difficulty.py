@@ -0,0 +1,50 @@
+"""Headless Monte Carlo calibration of the harmony target curves
+
+Plays many simulated games against the real Element/FractalStructure logic
+on every CPU core and prints pass-rate tables per difficulty and level.
+Needs no display or audio device, so it can run on a CI box.
+"""
+import os
+import sys
+import json
+import argparse
+import time
+
+# No window or sound device is needed for the simulation
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from classes.DifficultySimulator import DifficultySimulator, POLICY_GREEDY, POLICY_RANDOM
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how achievable the harmony targets are")
+    parser.add_argument('--levels', type=int, default=15, help="simulate levels 1..N (default 15)")
+    parser.add_argument('--games', type=int, default=200, help="games per level (default 200)")
+    parser.add_argument('--moves', type=int, default=40, help="moves per level (default 40)")
+    parser.add_argument('--policy', choices=[POLICY_GREEDY, POLICY_RANDOM], default=POLICY_GREEDY)
+    parser.add_argument('--epsilon', type=float, default=0.2, help="random move chance for the greedy policy")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the pass rates to this JSON file")
+    args = parser.parse_args()
+
+    simulator = DifficultySimulator(levels=range(1, args.levels + 1), games=args.games, moves=args.moves,
+                                    policy=args.policy, epsilon=args.epsilon, workers=args.workers,
+                                    seed=args.seed)
+
+    start = time.time()
+    rates = simulator.run()
+    elapsed = time.time() - start
+
+    print(DifficultySimulator.format_report(rates))
+    print(f"{args.levels * args.games} games with the {args.policy} policy "
+          f"on {simulator.workers} workers in {elapsed:.1f}s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rates, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import numpy as np
+
+
+class BatchHarmonyEvaluator:
+    """Score many structures at once from struct-of-arrays input
+
+    Each row of the input arrays describes one structure. Rows can be padded
+    to a common width; ``counts`` tells how many entries of each row are real.
+    The formula is the same one FractalStructure.calculate_harmony uses.
+    """
+
+    def __init__(self, level=1):
+        self.level = level  # Structure level used when none is passed to evaluate()
+
+    @staticmethod
+    def pack(structures):
+        """Turn a list of FractalStructure objects into padded evaluator arrays"""
+        width = max([len(s.elements) for s in structures] + [1])
+        ratios = np.zeros((len(structures), width))
+        levels = np.zeros((len(structures), width))
+        edge_counts = np.zeros(len(structures))
+        counts = np.zeros(len(structures), dtype=int)
+        structure_levels = np.zeros(len(structures))
+
+        for row, structure in enumerate(structures):
+            n = len(structure.elements)
+            counts[row] = n
+            ratios[row, :n] = [e.love_logic_ratio for e in structure.elements]
+            levels[row, :n] = [e.level for e in structure.elements]
+            edge_counts[row] = sum(len(e.connections) for e in structure.elements) / 2
+            structure_levels[row] = structure.level
+
+        return {
+            'love_logic_ratios': ratios,
+            'levels': levels,
+            'edge_counts': edge_counts,
+            'counts': counts,
+            'structure_levels': structure_levels
+        }
+
+    def evaluate(self, love_logic_ratios, levels, edge_counts, counts=None, structure_levels=None):
+        """Return harmony and its factors for every structure (row) in the input
+
+        love_logic_ratios and levels are (structures, elements) arrays.
+        edge_counts is either the number of undirected connections per
+        structure, shape (structures,), or per-element connection counts with
+        the same shape as levels. Every returned value is a (structures,) array.
+        """
+        ratios = np.atleast_2d(np.asarray(love_logic_ratios, dtype=float))
+        levels = np.asarray(levels, dtype=float).reshape(ratios.shape)
+        num_structures, width = ratios.shape
+
+        if counts is None:
+            counts = np.full(num_structures, width)
+        counts = np.asarray(counts, dtype=int)
+        if structure_levels is None:
+            structure_levels = self.level
+        structure_levels = np.broadcast_to(np.asarray(structure_levels, dtype=float), (num_structures,))
+
+        # Mask out padding so it never contributes to any factor
+        mask = np.arange(width)[None, :] < counts[:, None]
+        ratios = np.where(mask, ratios, 0.5)
+        levels = np.where(mask, levels, 0.0)
+        n = counts.astype(float)
+        safe_n = np.maximum(n, 1)
+
+        edge_counts = np.asarray(edge_counts, dtype=float)
+        if edge_counts.ndim == 2:
+            # Per-element connection counts - each edge is seen from both ends
+            edge_counts = np.where(mask, edge_counts, 0.0).sum(axis=1) / 2
+        edge_counts = edge_counts.reshape(num_structures)
+
+        # Diversity factor - ideal is ~40% love, ~40% logic, ~20% balanced
+        love_dominant = ((ratios > 0.6) & mask).sum(axis=1)
+        logic_dominant = ((ratios < 0.4) & mask).sum(axis=1)
+        balanced = ((ratios >= 0.4) & (ratios <= 0.6) & mask).sum(axis=1)
+        ideal_distribution = (np.abs(love_dominant / safe_n - 0.4) +
+                              np.abs(logic_dominant / safe_n - 0.4) +
+                              np.abs(balanced / safe_n - 0.2))
+        diversity = 1 - np.minimum(1, ideal_distribution / 2)
+        diversity = np.where((love_dominant == 0) | (logic_dominant == 0), diversity * 0.5, diversity)
+        diversity = np.where(counts <= 1, 0.5, diversity)
+
+        # Connection factor - optimal connection ratio is around 0.6
+        total_possible = n * (n - 1) / 2
+        connection_ratio = edge_counts / np.where(total_possible == 0, 1, total_possible)
+        connection = np.clip(1 - np.abs(0.6 - connection_ratio) * 1.5, 0, 1)
+        connection = np.where(total_possible == 0, 0.0, connection)
+
+        # Evolution factor and level variance
+        avg_evolution = levels.sum(axis=1) / safe_n
+        variance = np.where(mask, (levels - avg_evolution[:, None]) ** 2, 0.0).sum(axis=1) / safe_n
+        variance_factor = np.where(counts > 1, np.minimum(1.0, variance * 0.5), 0.0)
+        evolution = np.clip(1 - np.abs(2.5 - avg_evolution) / 2.5, 0, 1)
+
+        # Disharmony grows with level variance and with the structure level
+        level_factor = np.minimum(1.0, structure_levels / 10)
+        disharmony = (variance_factor * 0.5 + level_factor * 0.5) * 0.3
+
+        raw_harmony = diversity * 0.75 + connection * 0.15 + evolution * 0.1
+        harmony = np.clip(raw_harmony * (1 - disharmony) * 100, 0, 100)
+
+        # Empty structures score zero, like calculate_harmony
+        empty = counts <= 0
+        return {
+            'harmony': np.where(empty, 0.0, harmony),
+            'diversity': np.where(empty, 0.0, diversity),
+            'connection': np.where(empty, 0.0, connection),
+            'evolution': np.where(empty, 0.0, evolution),
+            'disharmony': np.where(empty, 0.0, disharmony)
+        }
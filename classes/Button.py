@@ -1,5 +1,7 @@
 import pygame
 
+from .TextCache import text_cache
+
 class Button:
     def __init__(self, x, y, width, height, text, color, hover_color):
         self.rect = pygame.Rect(x, y, width, height)
@@ -13,8 +15,8 @@ class Button:
         pygame.draw.rect(surface, color, self.rect)
         pygame.draw.rect(surface, (0, 0, 0), self.rect, 2)  # BLACK border
 
-        font = pygame.font.SysFont('Arial', 12)
-        text_surf = font.render(self.text, True, (0, 0, 0))  # BLACK text
+        font = text_cache.font('Arial', 12)
+        text_surf = text_cache.render(font, self.text, True, (0, 0, 0))  # BLACK text
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
 
@@ -0,0 +1,163 @@
+import contextlib
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .Element import Element
+from .StructurePattern import StructurePattern
+from .FractalStructure import FractalStructure
+
+# Policies the simulated players can use
+POLICY_RANDOM = 'random'  # Any legal move, uniformly at random
+POLICY_GREEDY = 'greedy'  # The best move from suggest_moves(), with some random exploration
+
+
+def _level_elements(level, rng):
+    """Create the starting elements of a level the same way the game does"""
+    if level == 1:
+        # A single random element (see the initial element in BeautifulImperfection.py)
+        element = Element(0, 0, size=50, love_logic_ratio=rng.uniform(0.2, 0.8))
+        element.shape = rng.randrange(len(Element.shapes))
+        return [element]
+
+    # Higher levels carry the previous structure as a pattern (see create_next_level)
+    pattern = StructurePattern([(0, 0)], levels=[level - 1])
+    if level == 2:
+        return [Element(0, 0, size=25, love_logic_ratio=0.6, level=2, structure_pattern=pattern),
+                Element(0, 0, size=25, love_logic_ratio=0.4, level=2, structure_pattern=pattern)]
+    return [Element(0, 0, size=35, level=level,
+                    love_logic_ratio=0.5 + (i % 2) * 0.1 - (i % 2 == 0) * 0.1,
+                    structure_pattern=pattern)
+            for i in range(level)]
+
+
+def _play_level(level, policy, moves, epsilon, seed):
+    """Play one level and return the best harmony reached"""
+    rng = random.Random(seed)
+    random.seed(seed)  # Element.create_child uses the global generator
+
+    fractal = FractalStructure()
+    fractal.level = level
+    elements = _level_elements(level, rng)
+    with fractal.batch():
+        for element in elements:
+            fractal.add_element(element)
+
+    best = fractal.harmony_score
+    for _ in range(moves):
+        move = None
+        if policy == POLICY_GREEDY and rng.random() >= epsilon:
+            suggestions = fractal.suggest_moves(1)
+            if suggestions:
+                move = suggestions[0][1:]
+        if move is None:
+            candidates = list(fractal.candidate_moves())
+            move = candidates[rng.randrange(len(candidates))]
+
+        fractal.apply_action(*move, elements=elements)
+        best = max(best, fractal.harmony_score)
+
+    return best
+
+
+def _play_levels(tasks, policy, moves, epsilon):
+    # Worker entry point - the game objects print debug output on every change
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return [(level, _play_level(level, policy, moves, epsilon, seed)) for level, seed in tasks]
+
+
+class DifficultySimulator:
+    """Plays many headless games against the real game logic to measure how achievable the targets are
+
+    Each simulated game plays one level from its starting layout for a fixed
+    number of moves and records the best harmony reached; a level counts as
+    passed for a difficulty when that harmony meets the level's target.
+    """
+
+    SLIDER_VALUES = list(range(1, 11))
+    DIFFICULTIES = {
+        'easy': FractalStructure.DIFFICULTY_EASY,
+        'normal': FractalStructure.DIFFICULTY_NORMAL,
+        'hard': FractalStructure.DIFFICULTY_HARD
+    }
+
+    def __init__(self, levels=range(1, 16), games=200, moves=40, policy=POLICY_GREEDY,
+                 epsilon=0.2, workers=None, seed=0):
+        self.levels = list(levels)
+        self.games = games          # Games simulated per level
+        self.moves = moves          # Moves a player makes per level
+        self.policy = policy
+        self.epsilon = epsilon      # Chance of a random move under the greedy policy
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+
+    def simulate(self):
+        """Return {level: [best harmony of each game]}, spread across worker processes"""
+        tasks = [(level, self.seed * 1000003 + level * 10007 + game)
+                 for level in self.levels for game in range(self.games)]
+        chunk_size = max(1, len(tasks) // (self.workers * 4))
+        chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+
+        results = {level: [] for level in self.levels}
+        if self.workers == 1:
+            outcomes = [_play_levels(chunk, self.policy, self.moves, self.epsilon) for chunk in chunks]
+        else:
+            # Fork where available so workers don't re-run the game script's start-up code
+            context = None
+            if 'fork' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+                futures = [executor.submit(_play_levels, chunk, self.policy, self.moves, self.epsilon)
+                           for chunk in chunks]
+                outcomes = [future.result() for future in futures]
+
+        for outcome in outcomes:
+            for level, harmony in outcome:
+                results[level].append(harmony)
+        return results
+
+    def pass_rates(self, results):
+        """Return pass rates (0-1) per target curve, difficulty and level"""
+        curves = {
+            'slider': {value: (lambda level, value=value: FractalStructure.target_from_slider(level, value))
+                       for value in self.SLIDER_VALUES},
+            'difficulty': {name: (lambda level, difficulty=difficulty: FractalStructure.target_for_difficulty(level, difficulty))
+                           for name, difficulty in self.DIFFICULTIES.items()},
+            'structure': {'level_target': self._structure_target}
+        }
+
+        rates = {}
+        for curve, settings in curves.items():
+            rates[curve] = {}
+            for setting, target_for in settings.items():
+                rates[curve][setting] = {}
+                for level, harmonies in results.items():
+                    target = target_for(level)
+                    passed = sum(1 for harmony in harmonies if harmony >= target)
+                    rates[curve][setting][level] = passed / len(harmonies) if harmonies else 0
+        return rates
+
+    @staticmethod
+    def _structure_target(level):
+        fractal = FractalStructure()
+        fractal.level = level
+        return fractal.calculate_level_target()
+
+    def run(self):
+        """Simulate and return the pass rates"""
+        return self.pass_rates(self.simulate())
+
+    @staticmethod
+    def format_report(rates):
+        """Format pass rates as plain-text tables, one per target curve"""
+        lines = []
+        for curve, settings in rates.items():
+            names = list(settings)
+            levels = sorted(next(iter(settings.values())))
+            lines.append(f"Pass rate (%) - {curve} targets")
+            lines.append("level " + "".join(f"{str(name):>13}" for name in names))
+            for level in levels:
+                lines.append(f"{level:>5} " + "".join(f"{settings[name][level] * 100:>13.1f}" for name in names))
+            lines.append("")
+        return "\n".join(lines)
@@ -0,0 +1,113 @@
+import numpy as np
+import pygame
+
+
+class DirtyRectRenderer:
+    """Pushes only the changed parts of a composited frame to the display
+
+    The game still composites every frame onto the display surface, which is
+    cheap in software; what is expensive is sending the whole frame to the
+    screen. present() compares the frame with the previous one in tiles and
+    calls pygame.display.update() with just the changed regions, merged into
+    as few rectangles as possible.
+    """
+
+    def __init__(self, surface, tile_size=32):
+        self.surface = surface
+        self.tile_size = tile_size
+        self.previous = None        # Pixels of the last presented frame
+        self.full_update = True     # Push the whole frame on the next present()
+        self.forced = []            # Regions to push on the next present() even if unchanged
+
+        # Counters for profiling
+        self.frames = 0
+        self.full_frames = 0
+        self.pixels_pushed = 0
+
+    def invalidate(self, rect=None):
+        """Push a region (or the whole frame) on the next present(), e.g. after the window was exposed"""
+        if rect is None:
+            self.full_update = True
+        else:
+            self.forced.append(pygame.Rect(rect))
+
+    def dirty_rects(self):
+        """Compare the current frame with the last presented one and return the changed regions"""
+        width, height = self.surface.get_size()
+        if self.surface.get_bytesize() == 3:
+            # 24-bit surfaces have no 2D pixel view; pack the channels instead
+            rgb = pygame.surfarray.array3d(self.surface).astype(np.uint32)
+            pixels = (rgb[:, :, 0] << 16) | (rgb[:, :, 1] << 8) | rgb[:, :, 2]
+        else:
+            view = pygame.surfarray.pixels2d(self.surface)
+            pixels = view.copy()
+            del view  # Unlock the surface
+
+        previous, self.previous = self.previous, pixels
+        if self.full_update or previous is None or previous.shape != pixels.shape:
+            self.full_update = False
+            self.forced = []
+            return [pygame.Rect(0, 0, width, height)]
+
+        # Mark every tile that holds at least one changed pixel
+        tile = self.tile_size
+        columns = -(-width // tile)
+        rows = -(-height // tile)
+        changed = np.zeros((columns * tile, rows * tile), dtype=bool)
+        changed[:width, :height] = pixels != previous
+        tiles = changed.reshape(columns, tile, rows, tile).any(axis=(1, 3))
+
+        rects = self._merge_tiles(tiles, width, height) + self.forced
+        self.forced = []
+        return rects
+
+    def _merge_tiles(self, tiles, width, height):
+        # Join changed tiles into horizontal runs, then stack identical runs from consecutive rows
+        tile = self.tile_size
+        open_runs = {}  # (first column, last column) -> Rect still growing downwards
+        rects = []
+        for row in range(tiles.shape[1]):
+            runs = []
+            column = 0
+            while column < tiles.shape[0]:
+                if tiles[column, row]:
+                    start = column
+                    while column + 1 < tiles.shape[0] and tiles[column + 1, row]:
+                        column += 1
+                    runs.append((start, column))
+                column += 1
+
+            next_open = {}
+            for run in runs:
+                rect = open_runs.pop(run, None)
+                if rect is None:
+                    rect = pygame.Rect(run[0] * tile, row * tile, (run[1] - run[0] + 1) * tile, 0)
+                    rects.append(rect)
+                rect.height += tile
+                next_open[run] = rect
+            open_runs = next_open
+
+        # Tiles on the right and bottom edges can overhang the surface
+        bounds = pygame.Rect(0, 0, width, height)
+        return [rect.clip(bounds) for rect in rects]
+
+    def present(self):
+        """Push the changed regions of the frame to the display and return them"""
+        rects = self.dirty_rects()
+        if rects:
+            pygame.display.update(rects)
+
+        self.frames += 1
+        if rects and rects[0].size == self.surface.get_size():
+            self.full_frames += 1
+        self.pixels_pushed += sum(rect.width * rect.height for rect in rects)
+        return rects
+
+    def stats(self):
+        """Return the profiling counters as a dict"""
+        width, height = self.surface.get_size()
+        return {
+            'frames': self.frames,
+            'full_frames': self.full_frames,
+            'pushed_fraction': self.pixels_pushed / max(1, self.frames * width * height)
+        }
@@ -0,0 +1,265 @@
+import math
+import random
+import itertools
+
+from .ShapeRegistry import SHAPES
+from .StructurePattern import StructurePattern
+
+# Colors
+LOVE = (255, 141, 0)    # #FF8D00 - Orange for love
+LOGIC = (1, 148, 220)   # #0194DC - Blue for logic
+BALANCE = (151, 218, 167)  # #97DAA7 - Green for perfect balance
+
+class ElementModel:
+    """Game state of one element - position, love/logic ratio, evolution, shape and connections
+
+    A compact __slots__ record with no pygame objects, so headless code (the
+    solver, the difficulty simulator) can create thousands of them cheaply.
+    Element adds the on-screen view on top.
+    """
+
+    __slots__ = ('id', 'x', 'y', 'size', 'love_logic_ratio', 'level', 'color', 'shape', 'connections',
+                 'structure', '_structure_pattern', 'evolve_direction')
+
+    # Shape geometry, indexed by shape
+    shapes = SHAPES
+
+    # Most nodes a structure pattern may grow to through evolve(); past it, the closest nodes are merged
+    pattern_node_budget = 64
+
+    # Seed for the random pattern growth in evolve(), so a session's patterns can be reproduced
+    pattern_seed = 0
+
+    # Source of stable element IDs (unique for the life of the process)
+    _next_id = itertools.count(1)
+
+    def __init__(self, x, y, size=30, love_logic_ratio=0.5, level=1, structure_pattern=None, element_id=None):
+        # Stable integer ID - kept across undo so elements can be referred to by ID in snapshots
+        self.id = element_id if element_id is not None else next(ElementModel._next_id)
+        self.x = x
+        self.y = y
+        self.size = size
+        self.love_logic_ratio = love_logic_ratio  # 0 = pure logic, 1 = pure love
+        self.level = level  # Evolution level
+        self.color = self.calculate_color()
+        self.connections = set()  # Connected elements (O(1) connect, disconnect and membership tests)
+        self.structure = None  # FractalStructure this element belongs to (notified on changes)
+        self.structure_pattern = structure_pattern  # For elements that represent previous structures
+        self.shape = 0  # 0=circle, 1=square, 2=star, 3=hexagon, 4=pentagon, 5=triangle, 6=diamond, 7=cross, 8=heart, 9=crescent
+
+        # If structure pattern is provided, try to get the shape from it
+        if self.structure_pattern is not None:
+            # Use the first shape in the pattern as the default shape for this element
+            self.shape = self.structure_pattern.node_attribute('shapes', 0, self.shape)
+
+        self.evolve_direction = 'up'  # Default evolution direction
+
+    @property
+    def structure_pattern(self):
+        """Immutable StructurePattern shared with sibling elements, or None"""
+        return self._structure_pattern
+
+    @structure_pattern.setter
+    def structure_pattern(self, pattern):
+        # Patterns in the old dict form are converted
+        if isinstance(pattern, dict):
+            pattern = StructurePattern.from_dict(pattern)
+        self._structure_pattern = pattern
+
+    def calculate_color(self):
+        # Calculate color based on love/logic ratio
+        # Love = #FF8D00 (orange)
+        # Logic = #0194DC (blue)
+        # Perfect balance (0.5) = #97DAA7 (green)
+
+        if abs(self.love_logic_ratio - 0.5) < 0.05:
+            # Close to perfect balance
+            return BALANCE
+        elif self.love_logic_ratio > 0.5:
+            # More love than logic - blend between balance and love
+            t = (self.love_logic_ratio - 0.5) * 2  # 0 to 1
+            r = int(BALANCE[0] + t * (LOVE[0] - BALANCE[0]))
+            g = int(BALANCE[1] + t * (LOVE[1] - BALANCE[1]))
+            b = int(BALANCE[2] + t * (LOVE[2] - BALANCE[2]))
+            return (r, g, b)
+        else:
+            # More logic than love - blend between balance and logic
+            t = (0.5 - self.love_logic_ratio) * 2  # 0 to 1
+            r = int(BALANCE[0] + t * (LOGIC[0] - BALANCE[0]))
+            g = int(BALANCE[1] + t * (LOGIC[1] - BALANCE[1]))
+            b = int(BALANCE[2] + t * (LOGIC[2] - BALANCE[2]))
+            return (r, g, b)
+
+    def invalidate_pattern(self):
+        """Called whenever the element's appearance changes (the view drops its cached rendering)"""
+
+    def is_over(self, pos):
+        # Check if a point (e.g. the mouse) is over this element
+        return ((self.x - pos[0])**2 + (self.y - pos[1])**2) <= (self.size//2)**2
+
+    def move_to(self, x, y):
+        if (self.x, self.y) != (x, y):
+            self.x, self.y = x, y
+            if self.structure is not None:
+                self.structure.on_position_changed(self)
+
+    def change_shape(self):
+        # Cycle to the next registered shape
+        self.shape = self.shapes.next_index(self.shape)
+        self.invalidate_pattern()
+        if self.structure is not None:
+            self.structure.on_shape_changed()
+
+        # For higher-level elements, the first shape in the pattern follows this element's shape
+        # (copy-on-write, so elements sharing the pattern are unaffected)
+        if self.structure_pattern:
+            self.structure_pattern = self.structure_pattern.with_head(shape=self.shape)
+
+        return self.shape
+
+    def adjust_love_logic(self, amount):
+        # Adjust the love/logic ratio and update color
+        old_ratio = self.love_logic_ratio
+        self.love_logic_ratio = max(0, min(1, self.love_logic_ratio + amount))
+        self.color = self.calculate_color()
+        self.invalidate_pattern()
+
+        # Keep the structure's harmony counters in sync
+        if self.structure is not None:
+            self.structure.on_ratio_changed(old_ratio, self.love_logic_ratio)
+
+        # For higher-level elements, the first color and ratio in the pattern follow this element
+        # (copy-on-write, so elements sharing the pattern are unaffected)
+        if self.structure_pattern:
+            self.structure_pattern = self.structure_pattern.with_head(color=self.color,
+                                                                      love_logic_ratio=self.love_logic_ratio)
+
+    @staticmethod
+    def evolution_step(level, cycles, direction):
+        """Return (new_level, new_direction) for one evolve() step, or None if it can't evolve"""
+        # Elements with a structure pattern cycle between min and max levels
+        if cycles:
+            # If at max level, start decreasing
+            if level >= 4:
+                new_level = level - 1
+            # If at min level, start increasing
+            elif level <= 1:
+                new_level = level + 1
+            # Otherwise continue in current direction
+            elif direction == 'down':
+                new_level = level - 1
+            else:
+                new_level = level + 1
+
+            # Set direction for next evolution
+            if new_level >= 4:
+                direction = 'down'
+            elif new_level <= 1:
+                direction = 'up'
+            return new_level, direction
+        # For regular elements (level 1), just increase up to max level
+        elif level < 4:  # Maximum level cap
+            return level + 1, direction
+        return None
+
+    def next_evolution_level(self):
+        """Return the level evolve() would move this element to, or None if it can't evolve"""
+        step = self.evolution_step(self.level, bool(self.structure_pattern), self.evolve_direction)
+        return step[0] if step else None
+
+    def evolve(self):
+        step = self.evolution_step(self.level, bool(self.structure_pattern), self.evolve_direction)
+        if step is None:
+            return False
+
+        old_level = self.level
+        self.level, self.evolve_direction = step
+        self.invalidate_pattern()
+        if self.level < old_level:
+            print(f"Element decreased to level {self.level}")
+        else:
+            print(f"Element increased to level {self.level}")
+
+        # Keep the structure's harmony counters in sync
+        if self.structure is not None:
+            self.structure.on_level_changed(old_level, self.level)
+
+        if self.structure_pattern:
+            # The first level in the pattern follows this element's level (copy-on-write)
+            self.structure_pattern = self.structure_pattern.with_head(level=self.level)
+
+            # Update the structure pattern complexity
+            self.structure_pattern = self.enhance_structure_pattern(self.structure_pattern)
+
+        return True
+
+    def enhance_structure_pattern(self, pattern):
+        # Add more detail to the structure pattern when evolving (returns a new pattern)
+        if not pattern:
+            return pattern
+
+        # Seeded from the element and its pattern, so growth is repeatable and leaves the global random state alone
+        rng = random.Random(hash((self.pattern_seed, self.id, self.level, pattern.count)))
+
+        # Add some detail points between existing ones, then simplify if over the node budget
+        return pattern.with_midpoints(rng).decimated(self.pattern_node_budget)
+
+    def connect_to(self, other_element):
+        # Connect this element to another
+        if other_element is self:
+            return
+        if other_element not in self.connections:
+            self.connections.add(other_element)
+            other_element.connections.add(self)
+
+            # Each side gains one connection entry
+            if self.structure is not None:
+                self.structure.on_connections_changed(1)
+            if other_element.structure is not None:
+                other_element.structure.on_connections_changed(1)
+
+    def disconnect_from(self, other_element):
+        # Remove the connection between this element and another
+        if other_element is self:
+            return
+        if other_element in self.connections:
+            self.connections.discard(other_element)
+            other_element.connections.discard(self)
+
+            # Each side loses one connection entry
+            if self.structure is not None:
+                self.structure.on_connections_changed(-1)
+            if other_element.structure is not None:
+                other_element.structure.on_connections_changed(-1)
+
+    def create_child(self, elements):
+        # Create a child element that inherits properties
+        # Position the child nearby
+        angle = random.uniform(0, 2 * math.pi)
+
+        # Use a smaller distance for structure pattern elements to keep children closer to their parents
+        if self.structure_pattern:
+            distance = self.size * 0.6  # Reduced distance factor
+        else:
+            distance = self.size * 0.8  # Reduced distance for regular elements too
+
+        child_x = self.x + distance * math.cos(angle)
+        child_y = self.y + distance * math.sin(angle)
+
+        # Child inherits love/logic ratio with slight variation
+        child_ratio = max(0, min(1, self.love_logic_ratio + random.uniform(-0.1, 0.1)))
+
+        # Create the child element with the same structure pattern if this is a higher-level element
+        child = type(self)(child_x, child_y, size=self.size,
+                           love_logic_ratio=child_ratio, level=self.level,  # Inherit parent's level
+                           structure_pattern=self.structure_pattern)
+
+        # Child inherits parent's shape
+        child.shape = self.shape
+
+        # Connect child to parent
+        self.connect_to(child)
+
+        # Add to elements list
+        elements.append(child)
+        return child
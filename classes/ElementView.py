@@ -0,0 +1,257 @@
+import pygame
+import math
+import numpy as np
+
+from .ShapeRegistry import SHAPES
+from .SpriteCache import SpriteCache
+
+# Detail levels for a shape, picked from its on-screen radius (see ElementView.detail_level)
+LOD_HIDDEN = 0  # Too small to see - skipped
+LOD_DISC = 1    # A plain filled disc
+LOD_FULL = 2    # The full shape sprite
+
+class ElementView:
+    """On-screen state and drawing of one element (its ElementModel holds the game state)"""
+
+    __slots__ = ('element', 'rect', 'dragging', 'structure_scale_factor',
+                 'pattern_surface', 'pattern_offset', 'pattern_key')
+
+    # Pre-rendered shape sprites shared by all elements (see SpriteCache for the memory budget)
+    sprite_cache = SpriteCache(SHAPES.draw, SHAPES.extent)
+
+    # Level-of-detail quality threshold in pixels. Nested shapes with a smaller radius are
+    # skipped, shapes under twice the threshold become plain discs, and structure patterns
+    # of elements under four times the threshold collapse to the element's own shape.
+    # Lower it for more detail, raise it for speed.
+    lod_threshold = 2
+
+    def __init__(self, element):
+        self.element = element
+        self.rect = pygame.Rect(element.x - element.size//2, element.y - element.size//2, element.size, element.size)
+        self.dragging = False
+        self.structure_scale_factor = 1.0  # Default scale factor for structure patterns
+
+        # Offscreen rendering of the shape and structure pattern (see draw_pattern_cached)
+        self.pattern_surface = None
+        self.pattern_offset = (0, 0)
+        self.pattern_key = None
+
+    def draw(self, surface):
+        element = self.element
+        # Update rectangle position (in place)
+        self.rect.update(element.x - element.size//2, element.y - element.size//2, element.size, element.size)
+
+        # Connections are drawn once per edge by FractalStructure.draw_connections (behind all elements)
+
+        # Draw element with fractal pattern based on level and type
+        if element.structure_pattern:
+            # This is a higher-level element containing a previous structure
+            # Background shape and structure pattern come from one cached offscreen surface
+            self.draw_pattern_cached(surface)
+        else:
+            # This is a regular element (level 1)
+            self.draw_fractal(surface, element.x, element.y, element.size//2, element.level)
+
+    def invalidate_pattern(self):
+        """Drop the cached pattern rendering so the next draw re-renders it"""
+        self.pattern_surface = None
+        self.pattern_key = None
+
+    def pattern_cache_key(self):
+        element = self.element
+        # Everything the pattern rendering depends on besides the position
+        # (patterns are immutable, so the pattern object itself stands for its contents)
+        return (element.size, element.shape, element.color, element.level, element.structure_pattern,
+                self.lod_threshold)
+
+    def draw_pattern_cached(self, surface):
+        """Draw the background shape and structure pattern with a single blit of a cached surface"""
+        element = self.element
+        key = self.pattern_cache_key()
+        if self.pattern_surface is None or key != self.pattern_key:
+            self.pattern_surface, self.pattern_offset = self.render_pattern_surface()
+            self.pattern_key = key
+
+        if self.pattern_surface is not None:
+            surface.blit(self.pattern_surface, (int(element.x) + self.pattern_offset[0],
+                                                int(element.y) + self.pattern_offset[1]))
+
+    def render_pattern_surface(self):
+        """Render the background shape and structure pattern offscreen; returns (surface, offset from center)"""
+        element = self.element
+        # Conservative reach: pattern nodes sit within 0.8 * size of the center on each axis,
+        # and a node with its fractal satellites spans about twice its node size
+        node_size = 10
+        if element.structure_pattern.count:
+            node_size = max(node_size, int(15 * self.pattern_scale()[2]))
+        reach = int(element.size * 1.2 + node_size * 2) + 4
+        canvas = pygame.Surface((reach * 2 + 1, reach * 2 + 1), pygame.SRCALPHA)
+
+        self.draw_shape(canvas, reach, reach, element.size//2)
+        if element.size//2 >= self.lod_threshold * 4:
+            self.draw_structure_pattern(canvas, reach, reach)
+
+        # Keep only the painted area
+        bounds = canvas.get_bounding_rect()
+        if bounds.width == 0 or bounds.height == 0:
+            return None, (0, 0)
+        pattern_surface = canvas.subsurface(bounds).copy()
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            pattern_surface = pattern_surface.convert_alpha()
+        return pattern_surface, (bounds.x - reach, bounds.y - reach)
+
+    def pattern_scale(self):
+        """Return (center_x, center_y, scale_factor) that fit the pattern positions inside this element"""
+        element = self.element
+        pattern = element.structure_pattern
+
+        # Calculate the scale factor to fit the structure inside this element
+        if pattern.count == 1:
+            # For single elements, use a fixed scale factor that's not too small
+            scale_factor = 0.4
+        else:
+            # For multiple elements, use a larger scale factor to preserve their size
+            # This ensures elements from previous levels don't appear smaller
+            scale_factor = min((element.size * 1.6) / pattern.width, (element.size * 1.6) / pattern.height)
+        return pattern.center_x, pattern.center_y, scale_factor
+
+    def draw_structure_pattern(self, surface, origin_x=None, origin_y=None):
+        element = self.element
+        pattern = element.structure_pattern
+        # Only draw the pattern if it has nodes
+        if not pattern or pattern.count == 0:
+            return
+
+        # The pattern is centered on the element unless drawn offscreen
+        if origin_x is None:
+            origin_x, origin_y = element.x, element.y
+
+        # Special case for single element from level 1
+        is_single_element = pattern.count == 1
+
+        center_x, center_y, self.structure_scale_factor = self.pattern_scale()
+        scale_factor = self.structure_scale_factor
+
+        # Scale and center all positions relative to the element at once
+        points = (pattern.positions - (center_x, center_y)) * scale_factor + (origin_x, origin_y)
+
+        # Original node colors, if the pattern has them
+        # (a single element is drawn in the current element's own color instead)
+        colors = None if is_single_element else pattern.colors
+
+        # Draw connections from the pattern using the element's color (for links only)
+        if len(pattern.edges):
+            starts = points[pattern.edges[:, 0]].tolist()
+            ends = points[pattern.edges[:, 1]].tolist()
+
+            # Use a blend of the two node colors where both are known
+            line_colors = [element.color] * len(pattern.edges)
+            if colors is not None:
+                known = np.flatnonzero((pattern.edges < len(colors)).all(axis=1))
+                if len(known):
+                    pairs = pattern.edges[known]
+                    blends = (colors[pairs[:, 0]].astype(np.int32) + colors[pairs[:, 1]]) // 2
+                    for i, blend in zip(known.tolist(), blends.tolist()):
+                        line_colors[i] = tuple(blend)
+
+            for start, end, line_color in zip(starts, ends, line_colors):
+                pygame.draw.line(surface, line_color, start, end, 2)  # Slightly thinner lines
+
+        # Draw the node with increased size
+        if is_single_element:
+            # Much smaller node size for single elements
+            node_size = max(5, int(8 * scale_factor))
+        else:
+            # Normal node size for multiple elements
+            node_size = max(10, int(15 * scale_factor))  # Increased size for better visibility
+
+        # Draw nodes from the pattern with their original properties
+        for i, (x, y) in enumerate(points.tolist()):
+            if is_single_element:
+                # Use the current element's properties (its level only if the pattern tracks levels)
+                node_color, node_shape = element.color, element.shape
+                node_level = element.level if pattern.levels is not None and len(pattern.levels) else 1
+            else:
+                node_color = pattern.node_attribute('colors', i, element.color)
+                node_shape = pattern.node_attribute('shapes', i, element.shape)
+                node_level = pattern.node_attribute('levels', i, 1)
+
+            # For evolved elements, draw fractal patterns based on their level
+            if node_level > 1:
+                self.draw_node_fractal(surface, int(x), int(y), node_size, node_level, node_shape, node_color)
+            else:
+                # Draw the appropriate shape
+                self.draw_node_shape(surface, int(x), int(y), node_size, node_shape, node_color)
+
+    def detail_level(self, radius):
+        """Return LOD_HIDDEN, LOD_DISC or LOD_FULL for a shape with this on-screen radius"""
+        if radius < self.lod_threshold:
+            return LOD_HIDDEN
+        elif radius < self.lod_threshold * 2:
+            return LOD_DISC
+        return LOD_FULL
+
+    def draw_node_fractal(self, surface, x, y, size, depth, shape, color):
+        """Draw a fractal pattern for a node based on its evolution level"""
+        # Draw the main shape
+        self.draw_node_shape(surface, x, y, size, shape, color)
+
+        # Draw smaller shapes around it if evolved (unless they would be too small to see)
+        if depth > 1 and self.detail_level(size // 2) != LOD_HIDDEN:
+            # Make evolution more visible by increasing the number of shapes
+            num_shapes = min(depth * 3, 12)  # More shapes at higher levels
+            for i in range(num_shapes):
+                angle = 2 * math.pi * i / num_shapes
+                # Increase the distance from center for better visibility
+                new_x = x + int(size * 1.0 * math.cos(angle))
+                new_y = y + int(size * 1.0 * math.sin(angle))
+                new_size = size // 2
+
+                # Recursive fractal pattern with decreasing depth
+                # Use the same shape as the parent element
+                self.draw_node_shape(surface, new_x, new_y, new_size, shape, color)
+
+    def draw_node_shape(self, surface, x, y, size, shape, color):
+        """Draw a specific shape for a node"""
+        detail = self.detail_level(size)
+        if detail == LOD_HIDDEN:
+            return
+        elif detail == LOD_DISC:
+            # Too small for the shape to be recognizable
+            pygame.draw.circle(surface, color, (x, y), size)
+            return
+
+        # Increase minimum size for better visibility
+        size = max(size, 5)
+        self.sprite_cache.blit(surface, x, y, size, shape, color)
+
+    def draw_fractal(self, surface, x, y, size, depth):
+        if depth <= 0:
+            return
+
+        # Draw main shape based on the shape property
+        self.draw_shape(surface, x, y, size)
+
+        # Draw smaller shapes around it if evolved (unless they would be too small to see)
+        if depth > 1 and self.detail_level(size // 2) != LOD_HIDDEN:
+            num_shapes = min(depth * 2, 8)  # More shapes at higher levels
+            for i in range(num_shapes):
+                angle = 2 * math.pi * i / num_shapes
+                new_x = x + int(size * 0.8 * math.cos(angle))
+                new_y = y + int(size * 0.8 * math.sin(angle))
+                new_size = size // 2
+
+                # Use the same shape as the parent element for sub-elements
+                self.draw_shape(surface, new_x, new_y, new_size)
+
+    def draw_shape(self, surface, x, y, size):
+        element = self.element
+        detail = self.detail_level(size)
+        if detail == LOD_HIDDEN:
+            return
+        elif detail == LOD_DISC:
+            pygame.draw.circle(surface, element.color, (x, y), size)
+            return
+
+        # Blit the cached sprite for this element's shape and color
+        self.sprite_cache.blit(surface, x, y, size, element.shape, element.color)
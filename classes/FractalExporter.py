@@ -0,0 +1,164 @@
+import math
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pygame
+
+from .PngWriter import PngWriter
+
+WHITE = (255, 255, 255)
+PURPLE = (128, 0, 128)  # Connection color, as in FractalStructure
+
+# View attributes that drawing replaces (besides the rect); saved and restored around a scaled draw
+VIEW_STATE = ('pattern_surface', 'pattern_offset', 'pattern_key', 'structure_scale_factor')
+PATTERN_STATE = ('pattern_surface', 'pattern_offset', 'pattern_key')
+
+# Extra pixels rendered around each tile and cropped off, so shapes clipped at a tile
+# border rasterize exactly as they would without the border
+BLEED = 4
+
+# What the tile workers render, set before the pool forks
+_job = None
+
+
+def _render_tile(left, top, width, height):
+    # Rasterize one tile of the scaled structure and return its packed RGB bytes
+    structure, scale, offset_x, offset_y, background, patterns = _job
+    tile = pygame.Surface((width + 2 * BLEED, height + 2 * BLEED))
+    tile.fill(background)
+    left, top = left - BLEED, top - BLEED
+
+    # Scene position -> output position; snapped to whole output pixels before moving
+    # into the tile, so every tile rounds a shared shape the same way
+    def to_output(x, y):
+        return offset_x + x * scale, offset_y + y * scale
+
+    # Connections first, behind the elements (each edge once). They are filled as quads on
+    # whole pixels rather than drawn as thick lines, which rasterize differently once clipped,
+    # so edges crossing tile borders join up seamlessly.
+    half_width = max(1, 3 * scale) / 2
+    for e, other in structure.edges():
+        (x1, y1), (x2, y2) = to_output(e.x, e.y), to_output(other.x, other.y)
+        length = math.hypot(x2 - x1, y2 - y1)
+        if length == 0:
+            continue
+        nx, ny = -(y2 - y1) / length * half_width, (x2 - x1) / length * half_width
+        quad = [(x1 + nx, y1 + ny), (x2 + nx, y2 + ny), (x2 - nx, y2 - ny), (x1 - nx, y1 - ny)]
+        pygame.draw.polygon(tile, PURPLE, [(math.floor(x + 0.5) - left, math.floor(y + 0.5) - top)
+                                           for x, y in quad])
+
+    for e in structure.elements:
+        x, y = to_output(e.x, e.y)
+        x, y = math.floor(x + 0.5) - left, math.floor(y + 0.5) - top
+        size = max(1, round(e.size * scale))
+        # Satellites and patterns stay well within three sizes of the center
+        reach = 3 * size
+        if x + reach < 0 or y + reach < 0 or x - reach > tile.get_width() or y - reach > tile.get_height():
+            continue
+
+        view = e.view
+        saved = (e.x, e.y, e.size), view.rect.copy(), {name: getattr(view, name) for name in VIEW_STATE}
+        try:
+            # Reuse the scaled pattern rendering from earlier tiles of this export
+            for name, value in patterns.get(e.id, {}).items():
+                setattr(view, name, value)
+            e.x, e.y, e.size = x, y, size
+            view.draw(tile)
+            patterns[e.id] = {name: getattr(view, name) for name in PATTERN_STATE}
+        finally:
+            (e.x, e.y, e.size), rect, view_state = saved
+            view.rect.update(rect)
+            for name, value in view_state.items():
+                setattr(view, name, value)
+
+    return pygame.image.tobytes(tile.subsurface((BLEED, BLEED, width, height)), 'RGB')
+
+
+class FractalExporter:
+    """Renders a structure at any resolution in tiles and streams them into a PNG file
+
+    The structure is scaled to fit the output and cut into tile_size tiles,
+    which are rasterized in parallel worker processes. Tiles are assembled one
+    row at a time and handed to a PngWriter, so memory use depends on the tile
+    size and the image width, never on the full image.
+    """
+
+    def __init__(self, tile_size=512, workers=None, margin=0.05, background=WHITE):
+        self.tile_size = tile_size
+        self.workers = workers or os.cpu_count() or 1
+        self.margin = margin            # Border around the structure, as a fraction of the output
+        self.background = background
+
+    def layout(self, structure, width, height):
+        """Return (scale, offset_x, offset_y) mapping scene positions to output pixels"""
+        if not structure.elements:
+            return 1.0, 0.0, 0.0
+
+        # Bounding box of the structure, including each element's drawn reach
+        left = min(e.x - e.size for e in structure.elements)
+        right = max(e.x + e.size for e in structure.elements)
+        top = min(e.y - e.size for e in structure.elements)
+        bottom = max(e.y + e.size for e in structure.elements)
+
+        usable = 1 - 2 * self.margin
+        scale = min(width * usable / max(1, right - left), height * usable / max(1, bottom - top))
+        offset_x = width / 2 - (left + right) / 2 * scale
+        offset_y = height / 2 - (top + bottom) / 2 * scale
+        return scale, offset_x, offset_y
+
+    def tiles(self, width, height):
+        """Return the tile rows of the output, each a list of (left, top, width, height)"""
+        size = self.tile_size
+        return [[(left, top, min(size, width - left), min(size, height - top))
+                 for left in range(0, width, size)]
+                for top in range(0, height, size)]
+
+    def export(self, structure, path, width, height):
+        """Render the structure at width x height into the PNG file at path and return path"""
+        global _job
+        scale, offset_x, offset_y = self.layout(structure, width, height)
+        _job = (structure, scale, offset_x, offset_y, self.background, {})
+
+        try:
+            with PngWriter(path, width, height) as writer:
+                # Workers are forked so they see the structure as it is right now, without pickling
+                # it; where fork is unavailable the tiles are rendered in this process instead
+                if self.workers == 1 or 'fork' not in multiprocessing.get_all_start_methods():
+                    for row in self.tiles(width, height):
+                        self._write_row(writer, width, [_render_tile(*tile) for tile in row])
+                else:
+                    context = multiprocessing.get_context('fork')
+                    with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+                        self._export_parallel(executor, writer, width, height)
+        finally:
+            _job = None
+        return path
+
+    def _export_parallel(self, executor, writer, width, height):
+        # Keep a few tile rows in flight, so finished rows never pile up waiting for the writer
+        rows = iter(self.tiles(width, height))
+        in_flight = deque()
+        ahead = max(2, self.workers)
+
+        for row in rows:
+            in_flight.append([executor.submit(_render_tile, *tile) for tile in row])
+            if len(in_flight) >= ahead:
+                break
+
+        while in_flight:
+            futures = in_flight.popleft()
+            self._write_row(writer, width, [future.result() for future in futures])
+            row = next(rows, None)
+            if row is not None:
+                in_flight.append([executor.submit(_render_tile, *tile) for tile in row])
+
+    @staticmethod
+    def _write_row(writer, width, tiles):
+        # Stitch one row of tiles side by side into full-width scanlines
+        arrays = [np.frombuffer(data, dtype=np.uint8) for data in tiles]
+        rows = sum(len(a) for a in arrays) // (width * 3)
+        band = np.concatenate([a.reshape(rows, -1) for a in arrays], axis=1)
+        writer.write_rows(band.tobytes())
@@ -1,6 +1,15 @@
 import pygame
 import os
 import datetime
+import heapq
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+
+from .HarmonyEngine import HarmonyEngine
+from .FractalExporter import FractalExporter
+from .SpatialGrid import SpatialGrid
+from .TextCache import text_cache
 
 # Colors
 BLACK = (0, 0, 0)
@@ -9,104 +18,289 @@ LOVE = (255, 141, 0)    # #FF8D00 - Orange for love
 LOGIC = (1, 148, 220)   # #0194DC - Blue for logic
 BALANCE = (151, 218, 167)  # #97DAA7 - Green for perfect balance
 WHITE = (255, 255, 255)
+PURPLE = (128, 0, 128)
+EDGE_COLORKEY = (255, 0, 255)  # Transparent color of the edge layer
+
+# What a background export renders, set before the export process forks
+_export_job = None
+
+
+def _run_export(width, height, filename, tile_size, workers):
+    # Runs in the export process, on the structure as it was when the export started
+    return _export_job.export_image(width, height, filename, tile_size, workers)
+
 
 class FractalStructure:
+     # Actions understood by harmony_delta() and suggest_moves()
+     ACTION_TOGGLE_CONNECTION = 'toggle_connection'
+     ACTION_ADJUST_LOVE_LOGIC = 'adjust_love_logic'
+     ACTION_EVOLVE = 'evolve'
+     ACTION_CREATE_CHILD = 'create_child'
+     ACTION_CHANGE_SHAPE = 'change_shape'
+
+     # Difficulty presets for target_for_difficulty()
+     DIFFICULTY_EASY = 0
+     DIFFICULTY_NORMAL = 1
+     DIFFICULTY_HARD = 2
+
      def __init__(self):
+         # Mutation version - bumped by every element and connection change.
+         # Derived values (hint, harmony breakdown, level target) are cached against it.
+         self.version = 0
+         self._version_pending = False  # A mutation happened inside a batch
+         self._memo = {}
+         self._memo_version = -1
+         self._batch_depth = 0  # > 0 while inside batch()
+
          self.elements = []
+         self.by_id = {}  # Element ID -> element, for every element in the structure
+         self.grid = SpatialGrid()  # Element positions, for picking and neighborhood queries
          self.harmony_score = 0
          self.level = 1
          self.previous_structure = None
+         self.engine = HarmonyEngine()  # Running counters behind the harmony score
+
+         # Layout version - bumped whenever an element moves.
+         # Resting layout version - bumped only when an element that isn't being dragged moves.
+         # The connection layer holds the edges between resting elements and is cached against
+         # (version, resting_layout_version, dragged elements), so a drag never rebuilds it.
+         self.layout_version = 0
+         self.resting_layout_version = 0
+         self._edge_layer = None
+         self._edge_layer_offset = (0, 0)
+         self._edge_layer_key = None
+
+     @property
+     def level(self):
+         return self._level
+
+     @level.setter
+     def level(self, value):
+         self._level = value
+         self.touch()
+
+     def touch(self):
+         """Record a mutation, invalidating cached derived values"""
+         if self._batch_depth > 0:
+             # Invalidate once when the batch exits
+             self._version_pending = True
+         else:
+             self.version += 1
+
+     def _memoized(self, key, compute):
+         # Return compute() cached until the next mutation
+         if self._memo_version != self.version:
+             self._memo = {}
+             self._memo_version = self.version
+         if key not in self._memo:
+             self._memo[key] = compute()
+         return self._memo[key]
 
      def add_element(self, element):
          self.elements.append(element)
+         self.by_id[element.id] = element
+         self.grid.insert(element)
+         element.structure = self
+         self.engine.add(element.love_logic_ratio, element.level, len(element.connections))
+         self.touch()
          self.calculate_harmony()
 
+     def set_elements(self, elements):
+         """Replace all elements at once and recount the harmony counters"""
+         for e in self.elements:
+             if e.structure is self:
+                 e.structure = None
+         self.elements = list(elements)
+         self.by_id = {e.id: e for e in self.elements}
+         self.grid.rebuild(self.elements)
+         for e in self.elements:
+             e.structure = self
+         self.engine.rebuild(self.elements)
+         self.touch()
+
+     # Notifications from Element mutators - keep the running counters in sync
+     def on_ratio_changed(self, old_ratio, new_ratio):
+         self.engine.change_ratio(old_ratio, new_ratio)
+         self.touch()
+
+     def on_level_changed(self, old_level, new_level):
+         self.engine.change_level(old_level, new_level)
+         self.touch()
+
+     def on_connections_changed(self, amount):
+         self.engine.change_degree(amount)
+         self.touch()
+
+     def on_shape_changed(self):
+         self.touch()
+
+     def on_position_changed(self, element):
+         self.grid.move(element)
+         self.layout_version += 1
+         if not getattr(element, 'dragging', False):
+             self.resting_layout_version += 1
+
+     def element_at(self, pos):
+         """Return the element under a point (e.g. the mouse), or None"""
+         return self.grid.pick(pos)
+
+     def elements_near(self, pos, radius):
+         """Return the elements whose centers are within radius of a point"""
+         return self.grid.near(pos, radius)
+
+     @contextmanager
+     def batch(self):
+         """Group several mutations and recompute harmony (and invalidate caches) once when the batch exits"""
+         self._batch_depth += 1
+         try:
+             yield self
+         finally:
+             self._batch_depth -= 1
+             if self._batch_depth == 0:
+                 if self._version_pending:
+                     self._version_pending = False
+                     self.version += 1
+                 self.calculate_harmony()
+
+     def get_harmony_breakdown(self):
+         """Return the harmony score and its factors (None with no elements), cached per version"""
+         return self._memoized('breakdown', lambda: self.engine.factors(self.level))
+
      def calculate_harmony(self):
+         # Defer the recomputation until the outermost batch exits
+         if self._batch_depth > 0:
+             return
+
          # Calculate harmony based on balance and connections
-         if not self.elements:
+         # The factors come from running counters, so this is O(1) per call
+         factors = self.get_harmony_breakdown()
+         if factors is None:
              self.harmony_score = 0
              return
 
-         # Get love/logic values for all elements
-         love_values = [e.love_logic_ratio for e in self.elements]
-         avg_love = sum(love_values) / len(love_values)
-         
-         # Calculate diversity factor - NEW APPROACH
-         # Instead of rewarding average close to 0.5, we reward having a mix of love and logic
-         # This means we want some elements with high love and some with high logic
-         
-         # First, check if we have enough elements to calculate diversity
-         if len(self.elements) <= 1:
-             # With only one element, diversity is impossible
-             diversity_factor = 0.5  # Neutral value
-         else:
-             # Count elements that are love-dominant (>0.6) and logic-dominant (<0.4)
-             love_dominant = sum(1 for v in love_values if v > 0.6)
-             logic_dominant = sum(1 for v in love_values if v < 0.4)
-             balanced = sum(1 for v in love_values if 0.4 <= v <= 0.6)
-             
-             # Calculate percentages
-             total_elements = len(self.elements)
-             love_percent = love_dominant / total_elements
-             logic_percent = logic_dominant / total_elements
-             balanced_percent = balanced / total_elements
-             
-             # Ideal distribution: ~40% love-dominant, ~40% logic-dominant, ~20% balanced
-             # Calculate how close we are to this ideal distribution
-             ideal_distribution = abs(love_percent - 0.4) + abs(logic_percent - 0.4) + abs(balanced_percent - 0.2)
-             # Convert to a 0-1 factor (0 = far from ideal, 1 = perfect match)
-             diversity_factor = 1 - min(1, ideal_distribution / 2)
-             
-             # Ensure we have both love and logic represented
-             if love_dominant == 0 or logic_dominant == 0:
-                 # Penalize if we're missing either love or logic elements
-                 diversity_factor *= 0.5
-         
-         # Connection factor - how well connected are elements
-         # Too many or too few connections can create disharmony
-         total_possible = len(self.elements) * (len(self.elements) - 1) / 2
-         if total_possible == 0:
-             connection_factor = 0
-         else:
-             total_connections = sum(len(e.connections) for e in self.elements) / 2
-             connection_ratio = total_connections / total_possible
-             
-             # Optimal connection ratio is around 0.6 (not too sparse, not too dense)
-             # Decreases as it moves toward 0 or 1
-             connection_factor = 1 - abs(0.6 - connection_ratio) * 1.5
-             connection_factor = max(0, min(1, connection_factor))  # Clamp between 0 and 1
-
-         # Evolution factor - balanced evolution is better than extremes
-         evolution_values = [e.level for e in self.elements]
-         avg_evolution = sum(evolution_values) / len(evolution_values)
-         
-         # Calculate evolution variance - more variance = more disharmony
-         if len(evolution_values) > 1:
-             evo_variance = sum((x - avg_evolution) ** 2 for x in evolution_values) / len(evolution_values)
-             # Scale variance to a reasonable range (0 to 1)
-             evo_variance_factor = min(1.0, evo_variance * 0.5)
-         else:
-             evo_variance_factor = 0
-         
-         # Evolution harmony is highest when average level is around 2.5 (balanced)
-         evolution_factor = 1 - abs(2.5 - avg_evolution) / 2.5
-         evolution_factor = max(0, min(1, evolution_factor))  # Clamp between 0 and 1
-         
-         # Apply disharmony factors - but reduce the impact of variance since we now want diversity
-         level_factor = min(1.0, self.level / 10)  # Caps at level 10
-         disharmony = (evo_variance_factor * 0.5 + level_factor * 0.5) * 0.3  # Reduced overall disharmony
-         
-         # Calculate overall harmony with diversity accounting for 75% as requested
-         raw_harmony = (diversity_factor * 0.75 + connection_factor * 0.15 + evolution_factor * 0.1)
-         adjusted_harmony = raw_harmony * (1 - disharmony)
-         
-         # Ensure harmony is between 0 and 100%
-         self.harmony_score = max(0, min(100, adjusted_harmony * 100))
-         
+         self.harmony_score = factors['harmony']
+
          # Debug output
          print(f"Level: {self.level}, Harmony: {self.harmony_score:.1f}%, " +
-               f"Diversity: {diversity_factor:.2f}, Connections: {connection_factor:.2f}, " +
-               f"Evolution: {evolution_factor:.2f}, Disharmony: {disharmony:.2f}")
+               f"Diversity: {factors['diversity']:.2f}, Connections: {factors['connection']:.2f}, " +
+               f"Evolution: {factors['evolution']:.2f}, Disharmony: {factors['disharmony']:.2f}")
+
+     def _harmony_with(self, **shift):
+         # Harmony score for the counters shifted by the given amounts
+         factors = self.engine.factors_with(self.level, **shift)
+         return factors['harmony'] if factors else 0
+
+     def delta_toggle_connection(self, element, other):
+         """Harmony change from connecting two elements (or disconnecting them if already connected)"""
+         if element is other:
+             return 0.0
+         # Only ends that belong to this structure count toward its connections
+         ends = (element.structure is self) + (other.structure is self)
+         if other in element.connections:
+             ends = -ends
+         return self._harmony_with(degree_sum=ends) - self._harmony_with()
+
+     def delta_adjust_love_logic(self, element, amount):
+         """Harmony change from element.adjust_love_logic(amount)"""
+         new_ratio = max(0, min(1, element.love_logic_ratio + amount))
+         shift = HarmonyEngine.bucket_shift(element.love_logic_ratio, new_ratio)
+         return self._harmony_with(**shift) - self._harmony_with()
+
+     def delta_evolve(self, element):
+         """Harmony change from element.evolve()"""
+         new_level = element.next_evolution_level()
+         if new_level is None:
+             return 0.0
+         return self._harmony_with(level_sum=new_level - element.level,
+                                   level_sq_sum=new_level * new_level - element.level * element.level) - self._harmony_with()
+
+     def delta_create_child(self, element):
+         """Expected harmony change from element.create_child() followed by add_element()"""
+         # The child's ratio is uniform within +/-0.1 of the parent's (clamped to 0-1),
+         # so weight each dominance bucket by the chance the child lands in it
+         low = element.love_logic_ratio - 0.1
+         high = element.love_logic_ratio + 0.1
+         p_love = max(0, high - max(low, 0.6)) / 0.2
+         p_logic = max(0, min(high, 0.4) - low) / 0.2
+         p_balanced = max(0, 1 - p_love - p_logic)
+
+         # The child joins at the parent's level with one connection (to the parent)
+         parent_end = 1 if element.structure is self else 0
+         shift = {
+             'count': 1,
+             'degree_sum': 1 + parent_end,
+             'level_sum': element.level,
+             'level_sq_sum': element.level * element.level
+         }
+
+         expected = 0
+         for counter, probability in (('love_dominant', p_love), ('logic_dominant', p_logic), ('balanced', p_balanced)):
+             if probability > 0:
+                 expected += probability * self._harmony_with(**{counter: 1}, **shift)
+         return expected - self._harmony_with()
+
+     def delta_change_shape(self, element):
+         """Harmony change from element.change_shape() - shapes never affect harmony"""
+         return 0.0
+
+     def harmony_delta(self, action, element, argument=None):
+         """Return the harmony change for a proposed action without mutating anything"""
+         if action == self.ACTION_TOGGLE_CONNECTION:
+             return self.delta_toggle_connection(element, argument)
+         elif action == self.ACTION_ADJUST_LOVE_LOGIC:
+             return self.delta_adjust_love_logic(element, argument)
+         elif action == self.ACTION_EVOLVE:
+             return self.delta_evolve(element)
+         elif action == self.ACTION_CREATE_CHILD:
+             return self.delta_create_child(element)
+         elif action == self.ACTION_CHANGE_SHAPE:
+             return self.delta_change_shape(element)
+         raise ValueError(f"Unknown action: {action}")
+
+     def apply_action(self, action, element, argument=None, elements=None):
+         """Perform an action understood by harmony_delta() and recompute harmony
+
+         elements is the game's element list that create_child appends new children to.
+         """
+         if action == self.ACTION_TOGGLE_CONNECTION:
+             if argument is element:
+                 raise ValueError("An element cannot be connected to itself")
+             if argument in element.connections:
+                 element.disconnect_from(argument)
+             else:
+                 element.connect_to(argument)
+         elif action == self.ACTION_ADJUST_LOVE_LOGIC:
+             element.adjust_love_logic(argument)
+         elif action == self.ACTION_EVOLVE:
+             element.evolve()
+         elif action == self.ACTION_CREATE_CHILD:
+             self.add_element(element.create_child(elements if elements is not None else []))
+         elif action == self.ACTION_CHANGE_SHAPE:
+             element.change_shape()
+         else:
+             raise ValueError(f"Unknown action: {action}")
+         self.calculate_harmony()
+
+     def candidate_moves(self):
+         """Yield every single-step action as (action, element, argument)"""
+         for i, element in enumerate(self.elements):
+             yield (self.ACTION_ADJUST_LOVE_LOGIC, element, 0.05)
+             yield (self.ACTION_ADJUST_LOVE_LOGIC, element, -0.05)
+             if element.next_evolution_level() is not None:
+                 yield (self.ACTION_EVOLVE, element, None)
+             yield (self.ACTION_CREATE_CHILD, element, None)
+             yield (self.ACTION_CHANGE_SHAPE, element, None)
+             for other in self.elements[i + 1:]:
+                 yield (self.ACTION_TOGGLE_CONNECTION, element, other)
+
+     def suggest_moves(self, limit=3):
+         """Return the highest-gain moves as (delta, action, element, argument), best first"""
+         return self._memoized(('moves', limit), lambda: self._rank_moves(limit))
+
+     def _rank_moves(self, limit):
+         scored = ((self.harmony_delta(action, element, argument), action, element, argument)
+                   for action, element, argument in self.candidate_moves())
+         return heapq.nlargest(limit, (move for move in scored if move[0] > 0), key=lambda move: move[0])
 
      def draw_harmony_meter(self, surface):
          # Draw harmony meter at the top of the screen
@@ -158,17 +352,82 @@ class FractalStructure:
          pygame.draw.rect(surface, BLACK, (x, y, meter_width, meter_height), 1)
 
          # Draw text
-         font = pygame.font.SysFont('Arial', 12)
-         text = font.render(f"Level {self.level} - Harmony: {self.harmony_score:.1f}%", True, BLACK)
+         font = text_cache.font('Arial', 12)
+         text = text_cache.render(font, f"Level {self.level} - Harmony: {self.harmony_score:.1f}%", True, BLACK)
          surface.blit(text, (x + meter_width // 2 - text.get_width() // 2, y + meter_height + 5))
 
+     def edges(self):
+         """Yield every connection once as (element, other), with element in this structure"""
+         by_id = self.by_id
+         for e in self.elements:
+             for other in e.connections:
+                 # Inner edges are yielded from their lower-ID end only
+                 if other.id > e.id or by_id.get(other.id) is not other:
+                     yield e, other
+
+     @staticmethod
+     def connection_indices(elements):
+         """Return connections as [(index, [connected indices])] for a list of elements
+
+         Connections to elements outside the list are left out. Indices are looked up
+         by element ID, so this is O(1) per connection.
+         """
+         index = {e.id: i for i, e in enumerate(elements)}
+         return [(i, [index[c.id] for c in e.connections if c.id in index])
+                 for i, e in enumerate(elements)]
+
+     def draw_connections(self, surface):
+         """Draw the connection lines (each edge once)
+
+         Edges between resting elements come from a cached layer; the few edges of
+         dragged elements change every frame, so they are drawn straight onto the surface.
+         """
+         moving = {e for e in self.elements if getattr(e, 'dragging', False)}
+         key = (self.version, self.resting_layout_version, frozenset(e.id for e in moving))
+         if key != self._edge_layer_key:
+             self._edge_layer, self._edge_layer_offset = self._render_edge_layer(moving)
+             self._edge_layer_key = key
+
+         if self._edge_layer is not None:
+             surface.blit(self._edge_layer, self._edge_layer_offset)
+
+         for e in moving:
+             for other in e.connections:
+                 # An edge between two dragged elements is drawn from its lower-ID end only
+                 if other in moving and other.id < e.id:
+                     continue
+                 pygame.draw.line(surface, PURPLE, (e.x, e.y), (other.x, other.y), 3)  # Thicker connection lines
+
+     def _render_edge_layer(self, moving):
+         # Returns (layer, top-left position) covering the edges between resting elements,
+         # or (None, (0, 0)) without any
+         segments = [((e.x, e.y), (other.x, other.y)) for e, other in self.edges()
+                     if e not in moving and other not in moving]
+         if not segments:
+             return None, (0, 0)
+
+         # Line width 3 reaches 2 pixels past the end points
+         xs = [x for start, end in segments for x in (start[0], end[0])]
+         ys = [y for start, end in segments for y in (start[1], end[1])]
+         left, top = int(min(xs)) - 2, int(min(ys)) - 2
+         width, height = int(max(xs)) - left + 3, int(max(ys)) - top + 3
+
+         layer = pygame.Surface((width, height))
+         layer.fill(EDGE_COLORKEY)
+         for (x1, y1), (x2, y2) in segments:
+             pygame.draw.line(layer, PURPLE, (x1 - left, y1 - top), (x2 - left, y2 - top), 3)  # Thicker connection lines
+         if pygame.display.get_init() and pygame.display.get_surface() is not None:
+             layer = layer.convert()
+         # Only rebuilt when a drag starts or ends or the connections change, so run-length
+         # encoding (slower to build, faster to blit) pays off
+         layer.set_colorkey(EDGE_COLORKEY, pygame.RLEACCEL)
+         return layer, (left, top)
+
      def save_structure(self):
          # Create a copy of the current structure for the next level
          self.previous_structure = {
              'elements': self.elements.copy(),
-             'connections': [(self.elements.index(e),
-                             [self.elements.index(c) for c in e.connections])
-                            for e in self.elements],
+             'connections': self.connection_indices(self.elements),
              'shapes': [e.shape for e in self.elements],
              'love_logic_ratios': [e.love_logic_ratio for e in self.elements],
              'levels': [e.level for e in self.elements]
@@ -189,6 +448,7 @@ class FractalStructure:
          fractal_surface.fill(WHITE)
 
          # Draw only the elements and their connections
+         self.draw_connections(fractal_surface)
          for element in self.elements:
              element.draw(fractal_surface)
 
@@ -196,12 +456,52 @@ class FractalStructure:
          pygame.image.save(fractal_surface, filename)
          return filename
 
+     def export_image(self, width=7680, height=4320, filename=None, tile_size=512, workers=None):
+         """Export the structure as a high-resolution PNG, rendered in tiles by worker processes"""
+         if not os.path.exists('saved_fractals'):
+             os.makedirs('saved_fractals')
+
+         if filename is None:
+             timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+             filename = f"saved_fractals/{timestamp}_l{self.level:02d}_{width}x{height}.png"
+
+         exporter = FractalExporter(tile_size=tile_size, workers=workers, background=WHITE)
+         return exporter.export(self, filename, width, height)
+
+     def submit_export(self, width=7680, height=4320, filename=None, tile_size=512, workers=None):
+         """Start export_image() in a background process and return a concurrent.futures.Future of the file name
+
+         The process is forked, so it exports the structure as it is right now while play
+         goes on. Where fork is unavailable the export runs here and the future is already done.
+         """
+         global _export_job
+         if 'fork' not in multiprocessing.get_all_start_methods():
+             future = Future()
+             future.set_result(self.export_image(width, height, filename, tile_size, workers))
+             return future
+
+         executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('fork'))
+         _export_job = self
+         try:
+             future = executor.submit(_run_export, width, height, filename, tile_size, workers)
+         finally:
+             _export_job = None
+         # Don't wait here - the process exits once the export is done
+         executor.shutdown(wait=False)
+         return future
+
      def advance_level(self):
          # Save the current structure for reference
          self.save_structure()
 
          # Clear current elements
+         for e in self.elements:
+             e.structure = None
          self.elements = []
+         self.by_id = {}
+         self.grid.clear()
+         self.engine.reset()
+         self.touch()
 
          # Increment level
          self.level += 1
@@ -212,6 +512,9 @@ class FractalStructure:
          return self.level
      def calculate_level_target(self):
          """Calculate the target harmony score for the current level"""
+         return self._memoized('level_target', self._calculate_level_target)
+
+     def _calculate_level_target(self):
          # Base target starts at 40% for level 1 and increases more gradually
          base_target = 40 + 20 * (1 - (1 / (self.level + 0.5)))
          
@@ -221,26 +524,78 @@ class FractalStructure:
          # Return the target score (capped at 85%)
          return min(85, base_target + variation)
 
+     @staticmethod
+     def target_from_slider(level, difficulty_value):
+         """Calculate target harmony based on difficulty slider value (1-10)"""
+         # At difficulty ≤ 2, no target (0%)
+         if difficulty_value <= 2:
+             return 0
+
+         # At difficulty 2-4 (easy): 30-40% base
+         elif difficulty_value <= 4:
+             # Map 2-4 to 0-1
+             t = (difficulty_value - 2) / 2
+             base_target = 30 + t * 10
+             variation = (level % 3) * 2  # 0, 2, or 4 percent variation
+             return min(75, base_target + variation + (level - 1) * 3)
+
+         # At difficulty 5-8 (normal): 40-50% base
+         elif difficulty_value <= 8:
+             # Map 5-8 to 0-1
+             t = (difficulty_value - 5) / 3
+             base_target = 40 + t * 10
+             variation = (level % 3) * 3  # 0, 3, or 6 percent variation
+             return min(85, base_target + variation + (level - 1) * 4)
+
+         # At difficulty 9-10 (hard): 50-60% base
+         else:
+             # Map 9-10 to 0-1
+             t = (difficulty_value - 9)
+             base_target = 50 + t * 10
+             variation = (level % 3) * 5  # 0, 5, or 10 percent variation
+             return min(95, base_target + variation + (level - 1) * 5)
+
+     @staticmethod
+     def target_for_difficulty(level, difficulty):
+         """Calculate the target harmony score for the current level based on difficulty"""
+         # Base target calculation from FractalStructure
+         if difficulty == FractalStructure.DIFFICULTY_EASY:
+             # Easier targets (30% start, slower progression)
+             base_target = 30 + 15 * (1 - (1 / (level + 1)))
+             variation = (level % 3) * 2  # 0, 2, or 4 percent variation
+             return min(75, base_target + variation)
+         elif difficulty == FractalStructure.DIFFICULTY_NORMAL:
+             # Normal targets (40% start, medium progression)
+             base_target = 40 + 20 * (1 - (1 / (level + 0.5)))
+             variation = (level % 3) * 3  # 0, 3, or 6 percent variation
+             return min(85, base_target + variation)
+         else:  # DIFFICULTY_HARD
+             # Harder targets (50% start, faster progression)
+             base_target = 50 + 25 * (1 - (1 / level))
+             variation = (level % 3) * 5  # 0, 5, or 10 percent variation
+             return min(95, base_target + variation)
+
      def get_strategic_hint(self):
          """Provide a strategic hint based on current harmony factors"""
-         # Get current factors
-         love_values = [e.love_logic_ratio for e in self.elements]
-         
-         if not love_values:
+         return self._memoized('hint', self._strategic_hint)
+
+     def _strategic_hint(self):
+         # Read the category counts straight from the harmony counters
+         engine = self.engine
+         if engine.count == 0:
              return "Add more elements to create a diverse structure."
-         
+
          # Count elements in each category
-         love_dominant = sum(1 for v in love_values if v > 0.6)
-         logic_dominant = sum(1 for v in love_values if v < 0.4)
-         balanced = sum(1 for v in love_values if 0.4 <= v <= 0.6)
-         
-         total_elements = len(self.elements)
-         
+         love_dominant = engine.love_dominant
+         logic_dominant = engine.logic_dominant
+
+         total_elements = engine.count
+
          # Count connections
-         total_possible = len(self.elements) * (len(self.elements) - 1) / 2
-         total_connections = sum(len(e.connections) for e in self.elements) / 2 if self.elements else 0
+         total_possible = total_elements * (total_elements - 1) / 2
+         total_connections = engine.degree_sum / 2
          connection_ratio = total_connections / total_possible if total_possible > 0 else 0
-         
+
          # Determine what's most needed based on diversity
          if total_elements < 3:
              return "Add more elements to create a diverse structure."
@@ -258,8 +613,7 @@ class FractalStructure:
              return "Your structure may have too many connections. Try a more elegant approach."
          else:
              # Check evolution levels
-             evolution_values = [e.level for e in self.elements]
-             avg_evolution = sum(evolution_values) / len(evolution_values) if evolution_values else 1
+             avg_evolution = engine.level_sum / total_elements
              if avg_evolution < 2:
                  return "Try evolving some elements (space key) to increase complexity."
              else:
@@ -283,8 +637,8 @@ class FractalStructure:
          pygame.draw.rect(surface, (0, 0, 0), (x, y, width, height), 1)
          
          # Draw title
-         font = pygame.font.SysFont('Arial', 14)
-         title = font.render(f"Level {self.level} Target", True, (0, 0, 0))
+         font = text_cache.font('Arial', 14)
+         title = text_cache.render(font, f"Level {self.level} Target", True, (0, 0, 0))
          surface.blit(title, (x + width//2 - title.get_width()//2, y + 5))
          
          # Draw target line - moved higher in the box
@@ -292,7 +646,7 @@ class FractalStructure:
          pygame.draw.line(surface, (255, 0, 0), (x + 10, target_y), (x + width - 10, target_y), 2)
          
          # Draw target text - adjusted position
-         target_text = font.render(f"{target:.1f}%", True, (255, 0, 0))
+         target_text = text_cache.render(font, f"{target:.1f}%", True, (255, 0, 0))
          surface.blit(target_text, (x + width - 30, target_y - 15))
          
          # Draw current harmony marker
@@ -300,11 +654,11 @@ class FractalStructure:
          pygame.draw.circle(surface, (0, 0, 255), (int(marker_x), target_y), 5)
          
          # Draw current harmony text - adjusted position
-         current_text = font.render(f"{self.harmony_score:.1f}%", True, (0, 0, 255))
+         current_text = text_cache.render(font, f"{self.harmony_score:.1f}%", True, (0, 0, 255))
          surface.blit(current_text, (marker_x - 15, target_y + 5))
          
          # Draw status message
-         status_font = pygame.font.SysFont('Arial', 12)
+         status_font = text_cache.font('Arial', 12)
          if self.harmony_score >= target:
              status = "Target Achieved!"
              color = (0, 128, 0)  # Green
@@ -323,5 +677,5 @@ class FractalStructure:
                  status = "Just starting"
                  color = (255, 0, 0)  # Red
          
-         status_text = status_font.render(status, True, color)
+         status_text = text_cache.render(status_font, status, True, color)
          surface.blit(status_text, (x + width//2 - status_text.get_width()//2, y + height - 15))
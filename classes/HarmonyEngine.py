@@ -0,0 +1,177 @@
+class HarmonyEngine:
+    """Running counters that let FractalStructure score harmony in O(1)"""
+
+    # Dominance buckets used by the diversity factor
+    LOVE = 'love'          # love/logic ratio > 0.6
+    LOGIC = 'logic'        # love/logic ratio < 0.4
+    BALANCED = 'balanced'  # 0.4 <= love/logic ratio <= 0.6
+
+    # Counter attribute that holds each bucket's element count
+    BUCKET_COUNTERS = {LOVE: 'love_dominant', LOGIC: 'logic_dominant', BALANCED: 'balanced'}
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # Number of elements being tracked
+        self.count = 0
+
+        # Dominance buckets
+        self.love_dominant = 0
+        self.logic_dominant = 0
+        self.balanced = 0
+
+        # Sum of len(e.connections) over all elements (each edge counts twice)
+        self.degree_sum = 0
+
+        # Evolution level sum and sum of squares (for mean and variance)
+        self.level_sum = 0
+        self.level_sq_sum = 0
+
+    @staticmethod
+    def bucket(ratio):
+        """Return the dominance bucket a love/logic ratio falls into"""
+        if ratio > 0.6:
+            return HarmonyEngine.LOVE
+        elif ratio < 0.4:
+            return HarmonyEngine.LOGIC
+        return HarmonyEngine.BALANCED
+
+    def _shift_bucket(self, ratio, amount):
+        bucket = self.bucket(ratio)
+        if bucket == self.LOVE:
+            self.love_dominant += amount
+        elif bucket == self.LOGIC:
+            self.logic_dominant += amount
+        else:
+            self.balanced += amount
+
+    def add(self, ratio, level, degree=0):
+        """Start tracking an element"""
+        self.count += 1
+        self._shift_bucket(ratio, 1)
+        self.degree_sum += degree
+        self.level_sum += level
+        self.level_sq_sum += level * level
+
+    def remove(self, ratio, level, degree=0):
+        """Stop tracking an element"""
+        self.count -= 1
+        self._shift_bucket(ratio, -1)
+        self.degree_sum -= degree
+        self.level_sum -= level
+        self.level_sq_sum -= level * level
+
+    def change_ratio(self, old_ratio, new_ratio):
+        self._shift_bucket(old_ratio, -1)
+        self._shift_bucket(new_ratio, 1)
+
+    def change_level(self, old_level, new_level):
+        self.level_sum += new_level - old_level
+        self.level_sq_sum += new_level * new_level - old_level * old_level
+
+    def change_degree(self, amount):
+        self.degree_sum += amount
+
+    def copy(self):
+        """Return an independent engine with the same counters"""
+        engine = HarmonyEngine.__new__(HarmonyEngine)
+        engine.__dict__.update(self.__dict__)
+        return engine
+
+    def rebuild(self, elements):
+        """Recount everything from scratch in a single pass"""
+        self.reset()
+        for e in elements:
+            self.add(e.love_logic_ratio, e.level, len(e.connections))
+
+    def factors(self, structure_level):
+        """Return the harmony score and its factors for the tracked elements"""
+        return self.compute_factors(self.count, self.love_dominant, self.logic_dominant,
+                                    self.balanced, self.degree_sum, self.level_sum,
+                                    self.level_sq_sum, structure_level)
+
+    def factors_with(self, structure_level, count=0, love_dominant=0, logic_dominant=0,
+                     balanced=0, degree_sum=0, level_sum=0, level_sq_sum=0):
+        """Return the factors as if the counters were shifted by the given amounts (nothing is mutated)"""
+        return self.compute_factors(self.count + count,
+                                    self.love_dominant + love_dominant,
+                                    self.logic_dominant + logic_dominant,
+                                    self.balanced + balanced,
+                                    self.degree_sum + degree_sum,
+                                    self.level_sum + level_sum,
+                                    self.level_sq_sum + level_sq_sum,
+                                    structure_level)
+
+    @classmethod
+    def bucket_shift(cls, old_ratio, new_ratio):
+        """Return the dominance bucket changes for moving a ratio, as factors_with() keyword arguments"""
+        old_bucket = cls.bucket(old_ratio)
+        new_bucket = cls.bucket(new_ratio)
+        if old_bucket == new_bucket:
+            return {}
+        return {cls.BUCKET_COUNTERS[old_bucket]: -1, cls.BUCKET_COUNTERS[new_bucket]: 1}
+
+    @staticmethod
+    def compute_factors(count, love_dominant, logic_dominant, balanced,
+                        degree_sum, level_sum, level_sq_sum, structure_level):
+        """Score a structure from its counters (same formula as calculate_harmony)"""
+        if count <= 0:
+            return None
+
+        # Diversity factor - reward a mix of love and logic
+        if count <= 1:
+            # With only one element, diversity is impossible
+            diversity_factor = 0.5  # Neutral value
+        else:
+            love_percent = love_dominant / count
+            logic_percent = logic_dominant / count
+            balanced_percent = balanced / count
+
+            # Ideal distribution: ~40% love-dominant, ~40% logic-dominant, ~20% balanced
+            ideal_distribution = abs(love_percent - 0.4) + abs(logic_percent - 0.4) + abs(balanced_percent - 0.2)
+            diversity_factor = 1 - min(1, ideal_distribution / 2)
+
+            # Penalize if we're missing either love or logic elements
+            if love_dominant == 0 or logic_dominant == 0:
+                diversity_factor *= 0.5
+
+        # Connection factor - optimal connection ratio is around 0.6
+        total_possible = count * (count - 1) / 2
+        if total_possible == 0:
+            connection_factor = 0
+        else:
+            total_connections = degree_sum / 2
+            connection_ratio = total_connections / total_possible
+            connection_factor = 1 - abs(0.6 - connection_ratio) * 1.5
+            connection_factor = max(0, min(1, connection_factor))  # Clamp between 0 and 1
+
+        # Evolution factor - balanced evolution is better than extremes
+        avg_evolution = level_sum / count
+
+        # Level variance from the running sums (integer numerator keeps it exact)
+        if count > 1:
+            evo_variance = (count * level_sq_sum - level_sum * level_sum) / (count * count)
+            evo_variance_factor = min(1.0, evo_variance * 0.5)
+        else:
+            evo_variance_factor = 0
+
+        # Evolution harmony is highest when average level is around 2.5 (balanced)
+        evolution_factor = 1 - abs(2.5 - avg_evolution) / 2.5
+        evolution_factor = max(0, min(1, evolution_factor))  # Clamp between 0 and 1
+
+        # Disharmony grows with level variance and with the structure level
+        level_factor = min(1.0, structure_level / 10)  # Caps at level 10
+        disharmony = (evo_variance_factor * 0.5 + level_factor * 0.5) * 0.3
+
+        # Diversity accounts for 75% of the raw harmony
+        raw_harmony = (diversity_factor * 0.75 + connection_factor * 0.15 + evolution_factor * 0.1)
+        adjusted_harmony = raw_harmony * (1 - disharmony)
+
+        return {
+            'harmony': max(0, min(100, adjusted_harmony * 100)),
+            'diversity': diversity_factor,
+            'connection': connection_factor,
+            'evolution': evolution_factor,
+            'disharmony': disharmony
+        }
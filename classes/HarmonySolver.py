@@ -0,0 +1,241 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .Element import Element
+from .FractalStructure import FractalStructure
+from .HarmonyEngine import HarmonyEngine
+
+# Move vocabulary - the same actions as FractalStructure.harmony_delta()
+TOGGLE_CONNECTION = FractalStructure.ACTION_TOGGLE_CONNECTION
+ADJUST_LOVE_LOGIC = FractalStructure.ACTION_ADJUST_LOVE_LOGIC
+EVOLVE = FractalStructure.ACTION_EVOLVE
+CREATE_CHILD = FractalStructure.ACTION_CREATE_CHILD
+CHANGE_SHAPE = FractalStructure.ACTION_CHANGE_SHAPE
+
+RATIO_STEP = 0.05  # Same step as the UP/DOWN arrow keys
+
+
+class _SearchState:
+    """One candidate structure in the beam, as plain picklable data"""
+
+    __slots__ = ('ratios', 'levels', 'directions', 'patterned', 'edges', 'engine', 'moves')
+
+    def __init__(self, ratios, levels, directions, patterned, edges, engine, moves):
+        self.ratios = ratios            # love/logic ratio per element
+        self.levels = levels            # evolution level per element
+        self.directions = directions    # evolve_direction per element
+        self.patterned = patterned      # True for elements with a structure pattern
+        self.edges = edges              # frozenset of (i, j) pairs with i < j
+        self.engine = engine            # HarmonyEngine counters for this state
+        self.moves = moves              # Moves taken from the starting structure
+
+    def key(self):
+        return (tuple(self.ratios), tuple(self.levels), tuple(self.directions), self.edges)
+
+    def candidate_moves(self):
+        count = len(self.ratios)
+        for i in range(count):
+            yield (ADJUST_LOVE_LOGIC, i, RATIO_STEP)
+            yield (ADJUST_LOVE_LOGIC, i, -RATIO_STEP)
+            if Element.evolution_step(self.levels[i], self.patterned[i], self.directions[i]):
+                yield (EVOLVE, i)
+            yield (CREATE_CHILD, i)
+            for j in range(i + 1, count):
+                yield (TOGGLE_CONNECTION, i, j)
+        # change_shape never affects harmony, so it is never worth a move
+
+    def score_after(self, move, structure_level):
+        """Harmony after a move, from the counters alone (O(1))"""
+        action, i = move[0], move[1]
+        engine = self.engine
+        if action == TOGGLE_CONNECTION:
+            shift = {'degree_sum': -2 if (i, move[2]) in self.edges else 2}
+        elif action == ADJUST_LOVE_LOGIC:
+            new_ratio = max(0, min(1, self.ratios[i] + move[2]))
+            shift = HarmonyEngine.bucket_shift(self.ratios[i], new_ratio)
+        elif action == EVOLVE:
+            new_level = Element.evolution_step(self.levels[i], self.patterned[i], self.directions[i])[0]
+            shift = {
+                'level_sum': new_level - self.levels[i],
+                'level_sq_sum': new_level * new_level - self.levels[i] * self.levels[i]
+            }
+        else:
+            # The child is modelled at its expected ratio, the parent's
+            shift = {
+                'count': 1,
+                HarmonyEngine.BUCKET_COUNTERS[HarmonyEngine.bucket(self.ratios[i])]: 1,
+                'degree_sum': 2,
+                'level_sum': self.levels[i],
+                'level_sq_sum': self.levels[i] * self.levels[i]
+            }
+        factors = engine.factors_with(structure_level, **shift)
+        return factors['harmony'] if factors else 0
+
+    def apply(self, move):
+        """Return the state after a move"""
+        action, i = move[0], move[1]
+        ratios, levels, directions = list(self.ratios), list(self.levels), list(self.directions)
+        patterned, edges = self.patterned, self.edges
+        engine = self.engine.copy()
+
+        if action == TOGGLE_CONNECTION:
+            pair = (i, move[2])
+            if pair in edges:
+                edges = edges - {pair}
+                engine.change_degree(-2)
+            else:
+                edges = edges | {pair}
+                engine.change_degree(2)
+        elif action == ADJUST_LOVE_LOGIC:
+            new_ratio = max(0, min(1, ratios[i] + move[2]))
+            engine.change_ratio(ratios[i], new_ratio)
+            ratios[i] = new_ratio
+        elif action == EVOLVE:
+            new_level, directions[i] = Element.evolution_step(levels[i], patterned[i], directions[i])
+            engine.change_level(levels[i], new_level)
+            levels[i] = new_level
+        else:
+            child = len(ratios)
+            ratios.append(ratios[i])
+            levels.append(levels[i])
+            directions.append(directions[i])
+            patterned = patterned + (patterned[i],)
+            edges = edges | {(i, child)}
+            engine.add(ratios[i], levels[i], 1)
+            engine.change_degree(1)
+
+        return _SearchState(ratios, levels, directions, patterned, edges, engine, self.moves + [move])
+
+
+def _search(snapshot, target, beam_width, max_depth):
+    """Beam search for the shortest move list reaching the target (runs in a worker process)"""
+    level = snapshot['level']
+    root = _SearchState(snapshot['ratios'], snapshot['levels'], snapshot['directions'],
+                        snapshot['patterned'], snapshot['edges'], snapshot['engine'], [])
+
+    root_factors = root.engine.factors(level)
+    best_score = root_factors['harmony'] if root_factors else 0
+    best_state = root
+    if best_score >= target:
+        return {'moves': [], 'harmony': best_score, 'reached': True}
+
+    beam = [root]
+    seen = {root.key()}
+    for depth in range(max_depth):
+        # Score every successor from the counters, then only build the best ones
+        candidates = []
+        for state in beam:
+            for move in state.candidate_moves():
+                candidates.append((state.score_after(move, level), state, move))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        next_beam = []
+        for score, state, move in candidates:
+            child = state.apply(move)
+            key = child.key()
+            if key in seen:
+                continue
+            seen.add(key)
+
+            if score >= target:
+                return {'moves': child.moves, 'harmony': score, 'reached': True}
+            if score > best_score:
+                best_score, best_state = score, child
+
+            next_beam.append(child)
+            if len(next_beam) >= beam_width:
+                break
+
+        if not next_beam:
+            break
+        beam = next_beam
+
+    # Target not reachable within the search budget - return the closest plan found
+    return {'moves': best_state.moves, 'harmony': best_score, 'reached': False}
+
+
+class HarmonySolver:
+    """Searches for the fewest game actions that bring a structure up to a harmony target
+
+    Moves are tuples of (action, element index, argument), where the indices
+    refer to structure.elements at the time the search was started and
+    create_child appends a new element at the end.
+    """
+
+    def __init__(self, beam_width=32, max_depth=12, max_workers=1):
+        self.beam_width = beam_width
+        self.max_depth = max_depth
+        self.max_workers = max_workers
+        self.executor = None
+
+    @staticmethod
+    def snapshot(structure):
+        """Capture the harmony-relevant state of a structure as plain picklable data"""
+        index = {id(e): i for i, e in enumerate(structure.elements)}
+        edges = set()
+        for i, e in enumerate(structure.elements):
+            for other in e.connections:
+                j = index.get(id(other))
+                if j is not None and i < j:
+                    edges.add((i, j))
+
+        return {
+            'level': structure.level,
+            'ratios': [e.love_logic_ratio for e in structure.elements],
+            'levels': [e.level for e in structure.elements],
+            'directions': [e.evolve_direction for e in structure.elements],
+            'patterned': tuple(bool(e.structure_pattern) for e in structure.elements),
+            'edges': frozenset(edges),
+            'engine': structure.engine.copy()
+        }
+
+    def solve(self, structure, target):
+        """Run the search in this process and return {'moves', 'harmony', 'reached'}"""
+        return _search(self.snapshot(structure), target, self.beam_width, self.max_depth)
+
+    def submit(self, structure, target):
+        """Start the search in the process pool and return a concurrent.futures.Future"""
+        if self.executor is None:
+            # Fork where available so workers don't re-run the game script's start-up code
+            context = None
+            if 'fork' in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context('fork')
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self.executor.submit(_search, self.snapshot(structure), target,
+                                    self.beam_width, self.max_depth)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    @staticmethod
+    def resolve_move(structure, move):
+        """Turn a solver move into (action, element, argument) as used by harmony_delta()"""
+        action, element = move[0], structure.elements[move[1]]
+        if action == TOGGLE_CONNECTION:
+            return action, element, structure.elements[move[2]]
+        elif action == ADJUST_LOVE_LOGIC:
+            return action, element, move[2]
+        return action, element, None
+
+    @staticmethod
+    def apply_move(structure, elements, move):
+        """Replay a solver move on the real structure (elements is the game's element list)"""
+        action, element, argument = HarmonySolver.resolve_move(structure, move)
+        # The real child's ratio is random, so a replayed create_child can score slightly differently
+        structure.apply_action(action, element, argument, elements)
+
+    @staticmethod
+    def describe_move(move):
+        """Return a short human-readable description of a move"""
+        action, number = move[0], move[1] + 1
+        if action == TOGGLE_CONNECTION:
+            return f"Toggle the connection between elements {number} and {move[2] + 1}"
+        elif action == ADJUST_LOVE_LOGIC:
+            return f"Give element {number} more {'love' if move[2] > 0 else 'logic'}"
+        elif action == EVOLVE:
+            return f"Evolve element {number}"
+        elif action == CREATE_CHILD:
+            return f"Create a child from element {number}"
+        return f"Change the shape of element {number}"
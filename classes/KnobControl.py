@@ -3,6 +3,8 @@ import math
 import json
 import os
 
+from .TextCache import text_cache
+
 class KnobControl:
     def __init__(self, x, y, min_val, max_val, initial_val, label="", size=80):
         self.x = x
@@ -14,7 +16,7 @@ class KnobControl:
         self.size = size
         self.active = False
         self.is_hovered = False
-        self.font = pygame.font.SysFont('Arial', 12)
+        self.font = text_cache.font('Arial', 12)
         self.angle = self.value_to_angle(self.value)
         self.knob_frames = []
         self.load_knob_frames()
@@ -158,7 +160,7 @@ class KnobControl:
         self.size = size
         self.active = False
         self.is_hovered = False
-        self.font = pygame.font.SysFont('Arial', 12)
+        self.font = text_cache.font('Arial', 12)
         self.angle = self.value_to_angle(self.value)
         self.knob_frames = []
         self.load_knob_frames()
@@ -292,26 +294,26 @@ class KnobControl:
 
         # Draw label
         if self.label:
-            label_text = self.font.render(self.label, True, (0, 0, 0))
+            label_text = text_cache.render(self.font, self.label, True, (0, 0, 0))
             surface.blit(label_text, (self.x + self.size//2 - label_text.get_width()//2, self.y - 20))
 
         # Draw value
-        value_text = self.font.render(f"{int(self.value)}", True, (0, 0, 0))
+        value_text = text_cache.render(self.font, f"{int(self.value)}", True, (0, 0, 0))
         surface.blit(value_text, (self.x + self.size//2 - value_text.get_width()//2, self.y + self.size + 5))
 
         # Draw difficulty labels
         if self.min_val == 1 and self.max_val == 10:  # Only for difficulty knob
             # No target
             if self.value <= 2:
-                diff_text = self.font.render("No Target", True, (100, 100, 100))
+                diff_text = text_cache.render(self.font, "No Target", True, (100, 100, 100))
             # Easy
             elif self.value <= 4:
-                diff_text = self.font.render("Easy", True, (0, 150, 0))
+                diff_text = text_cache.render(self.font, "Easy", True, (0, 150, 0))
             # Normal
             elif self.value <= 8:
-                diff_text = self.font.render("Normal", True, (0, 0, 150))
+                diff_text = text_cache.render(self.font, "Normal", True, (0, 0, 150))
             # Hard
             else:
-                diff_text = self.font.render("Hard", True, (150, 0, 0))
+                diff_text = text_cache.render(self.font, "Hard", True, (150, 0, 0))
 
             surface.blit(diff_text, (self.x + self.size + 10, self.y + self.size//2 - diff_text.get_height()//2))
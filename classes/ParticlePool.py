@@ -0,0 +1,118 @@
+import numpy as np
+import pygame
+
+
+class ParticlePool:
+    """Fixed-capacity particle system stored as NumPy arrays (one array per attribute)
+
+    Live particles always occupy the first `count` slots, so update() is a
+    handful of vectorized operations and dead particles are compacted away
+    without allocating. Particles are drawn from pre-rendered alpha circle
+    sprites, one per (size, color, alpha bucket).
+    """
+
+    ALPHA_BUCKETS = 16       # Fade steps between invisible and fully opaque
+    MAX_SPRITES = 1024       # Sprite cache entries before it is flushed
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.count = 0
+
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.dx = np.zeros(capacity, dtype=np.float32)
+        self.dy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.max_life = np.ones(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+
+        self.sprites = {}
+
+    def __len__(self):
+        return self.count
+
+    @staticmethod
+    def burst(x, y, color, count=20, speed=3, size_range=(2, 6), duration=30, rng=None):
+        """Return a batch of particles flying out of (x, y), for extend()"""
+        rng = rng or np.random.default_rng()
+        angle = rng.uniform(0, 2 * np.pi, count)
+        speed_val = rng.uniform(1, speed, count)
+        life = rng.integers(duration // 2, duration, count, endpoint=True)
+        return {
+            'x': np.full(count, x, dtype=np.float32),
+            'y': np.full(count, y, dtype=np.float32),
+            'dx': np.cos(angle) * speed_val,
+            'dy': np.sin(angle) * speed_val,
+            'size': rng.integers(size_range[0], size_range[1], count, endpoint=True),
+            'color': np.tile(np.asarray(color[:3], dtype=np.uint8), (count, 1)),
+            'life': life,
+            'max_life': life
+        }
+
+    def extend(self, batch):
+        """Add a batch from burst(); particles beyond the capacity are dropped"""
+        start = self.count
+        added = min(len(batch['x']), self.capacity - start)
+        if added <= 0:
+            return
+        end = start + added
+        for name in ('x', 'y', 'dx', 'dy', 'size', 'color', 'life', 'max_life'):
+            getattr(self, name)[start:end] = batch[name][:added]
+        self.count = end
+
+    def clear(self):
+        self.count = 0
+
+    def update(self):
+        """Move every particle one step and drop the ones that died"""
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.dx[:n]
+        self.y[:n] += self.dy[:n]
+        self.life[:n] -= 1
+
+        # Compact the survivors to the front of the arrays
+        alive = np.flatnonzero(self.life[:n] > 0)
+        if len(alive) < n:
+            for array in (self.x, self.y, self.dx, self.dy, self.life, self.max_life, self.size, self.color):
+                array[:len(alive)] = array[alive]
+            self.count = len(alive)
+
+    def draw(self, surface):
+        """Draw every particle, fading out with its remaining life"""
+        n = self.count
+        if n == 0:
+            return
+
+        # Alpha based on remaining life, quantized to the sprite buckets
+        alpha = (255 * self.life[:n]) // self.max_life[:n]
+        buckets = (alpha * (self.ALPHA_BUCKETS - 1) + 127) // 255
+        size = self.size[:n]
+        left = (self.x[:n] - size).astype(np.int32)
+        top = (self.y[:n] - size).astype(np.int32)
+
+        if len(self.sprites) > self.MAX_SPRITES:
+            self.sprites.clear()
+
+        blits = []
+        for size_i, color, bucket, px, py in zip(size.tolist(), self.color[:n].tolist(),
+                                                 buckets.tolist(), left.tolist(), top.tolist()):
+            if bucket == 0:
+                continue
+            key = (size_i, tuple(color), bucket)
+            sprite = self.sprites.get(key)
+            if sprite is None:
+                sprite = self._render_sprite(*key)
+                self.sprites[key] = sprite
+            blits.append((sprite, (px, py)))
+        surface.blits(blits, doreturn=False)
+
+    def _render_sprite(self, size, color, bucket):
+        sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        alpha = bucket * 255 // (self.ALPHA_BUCKETS - 1)
+        pygame.draw.circle(sprite, color + (alpha,), (size, size), size)
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        return sprite
@@ -0,0 +1,79 @@
+import struct
+import zlib
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+FILTER_NONE = b'\x00'  # Per-scanline filter byte
+
+
+class PngWriter:
+    """Writes an RGB PNG file a band of rows at a time
+
+    Rows are compressed as they arrive and flushed out as IDAT chunks, so only
+    the rows being written are ever held in memory, however large the image.
+    """
+
+    def __init__(self, path, width, height, compression=6, chunk_size=1 << 20):
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.rows_written = 0
+        self.compressor = zlib.compressobj(compression)
+        self.pending = []           # Compressed data not yet written as an IDAT chunk
+        self.pending_bytes = 0
+
+        self.file = open(path, 'wb')
+        self.file.write(PNG_SIGNATURE)
+        # 8 bits per channel, color type 2 (RGB), default compression/filter, no interlace
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+    def write_rows(self, pixels):
+        """Append whole rows of packed RGB bytes (width * 3 bytes per row, top to bottom)"""
+        stride = self.width * 3
+        rows = len(pixels) // stride
+        if rows * stride != len(pixels):
+            raise ValueError("pixel data is not a whole number of rows")
+        if self.rows_written + rows > self.height:
+            raise ValueError("more rows than the image height")
+
+        view = memoryview(pixels)
+        for row in range(rows):
+            self._queue(self.compressor.compress(FILTER_NONE))
+            self._queue(self.compressor.compress(view[row * stride:(row + 1) * stride]))
+        self.rows_written += rows
+
+    def close(self):
+        if self.rows_written != self.height:
+            self.file.close()
+            raise ValueError(f"only {self.rows_written} of {self.height} rows were written")
+        self._queue(self.compressor.flush())
+        self._flush()
+        self._write_chunk(b'IEND', b'')
+        self.file.close()
+
+    def _queue(self, data):
+        if data:
+            self.pending.append(data)
+            self.pending_bytes += len(data)
+            if self.pending_bytes >= self.chunk_size:
+                self._flush()
+
+    def _flush(self):
+        if self.pending:
+            self._write_chunk(b'IDAT', b''.join(self.pending))
+            self.pending = []
+            self.pending_bytes = 0
+
+    def _write_chunk(self, kind, data):
+        self.file.write(struct.pack('>I', len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
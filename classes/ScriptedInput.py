@@ -0,0 +1,62 @@
+import json
+
+import pygame
+
+
+class ScriptedInput:
+    """Replays scripted input frame by frame, in place of the keyboard and mouse (for headless runs)
+
+    A script is a list of steps, each firing on a frame number:
+        {"frame": 10, "key": "c"}            press and release a key (pygame key name)
+        {"frame": 12, "click": [400, 300]}   press and release the left mouse button at a position
+        {"frame": 20, "press": [400, 300]}   press the left mouse button (start a drag)
+        {"frame": 21, "move": [420, 310]}    move the mouse
+        {"frame": 30, "release": [420, 310]} release the left mouse button
+        {"frame": 90, "quit": true}          close the game
+    """
+
+    def __init__(self, steps):
+        self.steps = sorted(steps, key=lambda step: step['frame'])
+        self.position = 0           # Index of the next step to fire
+        self.mouse_pos = (0, 0)     # Where the scripted mouse currently is
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def finished(self):
+        return self.position >= len(self.steps)
+
+    def events(self, frame):
+        """Return the pygame events of every step due by this frame"""
+        events = []
+        while self.position < len(self.steps) and self.steps[self.position]['frame'] <= frame:
+            events.extend(self._step_events(self.steps[self.position]))
+            self.position += 1
+        return events
+
+    def _step_events(self, step):
+        if 'key' in step:
+            name = step['key']
+            key = pygame.key.key_code(name)
+            unicode = name if len(name) == 1 else ''
+            return [pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=unicode),
+                    pygame.event.Event(pygame.KEYUP, key=key, mod=0, unicode=unicode)]
+        elif 'click' in step:
+            self.mouse_pos = tuple(step['click'])
+            return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=self.mouse_pos, button=1),
+                    pygame.event.Event(pygame.MOUSEBUTTONUP, pos=self.mouse_pos, button=1)]
+        elif 'press' in step:
+            self.mouse_pos = tuple(step['press'])
+            return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=self.mouse_pos, button=1)]
+        elif 'release' in step:
+            self.mouse_pos = tuple(step['release'])
+            return [pygame.event.Event(pygame.MOUSEBUTTONUP, pos=self.mouse_pos, button=1)]
+        elif 'move' in step:
+            old_pos, self.mouse_pos = self.mouse_pos, tuple(step['move'])
+            rel = (self.mouse_pos[0] - old_pos[0], self.mouse_pos[1] - old_pos[1])
+            return [pygame.event.Event(pygame.MOUSEMOTION, pos=self.mouse_pos, rel=rel, buttons=(0, 0, 0))]
+        elif step.get('quit'):
+            return [pygame.event.Event(pygame.QUIT)]
+        raise ValueError(f"Unknown scripted input step: {step}")
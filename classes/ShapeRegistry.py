@@ -0,0 +1,152 @@
+import math
+import random
+
+import numpy as np
+import pygame
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+
+# Part kinds
+POLYGON = 'polygon'  # geometry is an (N, 2) array of unit vertices
+CIRCLE = 'circle'    # geometry is (center_x, center_y, radius) in units
+RECT = 'rect'        # geometry is (left, top, width, height) in units
+
+
+def regular_polygon(sides, start_angle=0.0, radii=(1.0,)):
+    """Return unit vertices of a regular polygon (alternating radii make a star)"""
+    angles = start_angle + 2 * math.pi * np.arange(sides) / sides
+    radius = np.resize(np.asarray(radii, dtype=float), sides)
+    return np.column_stack((radius * np.cos(angles), radius * np.sin(angles)))
+
+
+def heart(points=30):
+    """Return unit vertices of the heart curve"""
+    t = 2 * math.pi * np.arange(points) / points
+    x = np.sin(t) ** 3
+    y = -(13 * np.cos(t) - 5 * np.cos(2 * t) - 2 * np.cos(3 * t) - np.cos(4 * t)) / 16
+    return np.column_stack((x, y))
+
+
+class Shape:
+    """One registry entry: a name and the unit-sized parts it is drawn from"""
+
+    def __init__(self, name, parts):
+        self.name = name
+        # Each part is (kind, geometry, paint, outlined); paint None means the element's color
+        self.parts = parts
+
+        # Furthest any part reaches from the center, in units of size
+        self.extent = max(self._part_extent(kind, geometry) for kind, geometry, _, _ in parts)
+
+    @staticmethod
+    def _part_extent(kind, geometry):
+        if kind == CIRCLE:
+            cx, cy, radius = geometry
+            return math.hypot(cx, cy) + radius
+        elif kind == RECT:
+            left, top, width, height = geometry
+            return max(math.hypot(px, py) for px in (left, left + width) for py in (top, top + height))
+        return float(np.max(np.hypot(geometry[:, 0], geometry[:, 1])))
+
+
+class ShapeRegistry:
+    """All element shapes as precomputed unit geometry, drawn by a single rasterizer
+
+    Shapes are identified by their index, which is what Element.shape and the
+    saved structure patterns store. Unknown indices are drawn as the first shape.
+    """
+
+    def __init__(self):
+        self.shapes = []
+
+    def __len__(self):
+        return len(self.shapes)
+
+    def register(self, name, parts):
+        """Add a shape and return its index"""
+        self.shapes.append(Shape(name, parts))
+        return len(self.shapes) - 1
+
+    def get(self, index):
+        if 0 <= index < len(self.shapes):
+            return self.shapes[index]
+        return self.shapes[0]
+
+    def names(self):
+        return [shape.name for shape in self.shapes]
+
+    def name(self, index):
+        return self.get(index).name
+
+    def next_index(self, index):
+        """Return the shape after index, wrapping around"""
+        return (index + 1) % len(self.shapes)
+
+    def random_index(self):
+        return random.randrange(len(self.shapes))
+
+    def extent(self, index):
+        """Return how far a shape reaches from its center, in units of size"""
+        return self.get(index).extent
+
+    def draw(self, surface, x, y, size, index, color, outline=True):
+        """Draw a shape centered at (x, y); all fills first, then the outlines"""
+        parts = self.get(index).parts
+        origin = np.array((x, y), dtype=float)
+
+        # Scale and translate each part's unit vertices in one vectorized step
+        placed = []
+        for kind, geometry, paint, outlined in parts:
+            if kind == CIRCLE:
+                cx, cy, radius = geometry
+                placed.append((kind, (int(x + cx * size), int(y + cy * size), int(radius * size)),
+                               paint or color, outlined))
+            elif kind == RECT:
+                left, top, width, height = geometry
+                placed.append((kind, pygame.Rect(x + left * size, y + top * size, width * size, height * size),
+                               paint or color, outlined))
+            else:
+                placed.append((kind, (geometry * size + origin).tolist(), paint or color, outlined))
+
+        for kind, geometry, paint, _ in placed:
+            if kind == CIRCLE:
+                pygame.draw.circle(surface, paint, geometry[:2], geometry[2])
+            elif kind == RECT:
+                pygame.draw.rect(surface, paint, geometry)
+            else:
+                pygame.draw.polygon(surface, paint, geometry)
+
+        if outline:
+            for kind, geometry, _, outlined in placed:
+                if not outlined:
+                    continue
+                if kind == CIRCLE:
+                    pygame.draw.circle(surface, BLACK, geometry[:2], geometry[2], 1)
+                elif kind == RECT:
+                    pygame.draw.rect(surface, BLACK, geometry, 1)
+                else:
+                    pygame.draw.polygon(surface, BLACK, geometry, 1)
+
+    @classmethod
+    def default(cls):
+        """Return a registry holding the game's ten shapes, in their saved index order"""
+        registry = cls()
+        registry.register("Circle", [(CIRCLE, (0, 0, 1), None, True)])
+        registry.register("Square", [(RECT, (-1, -1, 2, 2), None, True)])
+        registry.register("Star", [(POLYGON, regular_polygon(10, math.pi / 2, (1.0, 0.4)), None, True)])
+        registry.register("Hexagon", [(POLYGON, regular_polygon(6), None, True)])
+        registry.register("Pentagon", [(POLYGON, regular_polygon(5, -math.pi / 2), None, True)])
+        registry.register("Triangle", [(POLYGON, regular_polygon(3, -math.pi / 2), None, True)])
+        registry.register("Diamond", [(POLYGON, regular_polygon(4, -math.pi / 2), None, True)])
+        registry.register("Cross", [(RECT, (-1, -1 / 3, 2, 2 / 3), None, True),   # Horizontal bar
+                                    (RECT, (-1 / 3, -1, 2 / 3, 2), None, True)])  # Vertical bar
+        registry.register("Heart", [(POLYGON, heart(), None, True)])
+        # A white circle offset over the base circle cuts out the crescent
+        registry.register("Crescent", [(CIRCLE, (0, 0, 1), None, True),
+                                       (CIRCLE, (0.4, 0, 0.9), WHITE, False)])
+        return registry
+
+
+# Registry shared by the game
+SHAPES = ShapeRegistry.default()
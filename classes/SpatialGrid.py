@@ -0,0 +1,96 @@
+import math
+
+
+class SpatialGrid:
+    """Uniform grid over element centers for O(1) picking and neighborhood queries
+
+    Each element is filed in the cell holding its center and moved between
+    cells as it is dragged, so a query only looks at the few cells around a
+    point instead of scanning every element.
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}         # (column, row) -> {element id: element}, in insertion order
+        self.located = {}       # element id -> (cell, insertion order)
+        self.next_order = 0
+        self.max_radius = 0     # Largest element radius seen, bounds the cells a pick must check
+
+    def __len__(self):
+        return len(self.located)
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, element):
+        if element.id in self.located:
+            self.move(element)
+            return
+        cell = self._cell(element.x, element.y)
+        self.cells.setdefault(cell, {})[element.id] = element
+        self.located[element.id] = (cell, self.next_order)
+        self.next_order += 1
+        self.max_radius = max(self.max_radius, element.size // 2)
+
+    def remove(self, element):
+        entry = self.located.pop(element.id, None)
+        if entry is None:
+            return
+        cell = entry[0]
+        members = self.cells[cell]
+        del members[element.id]
+        if not members:
+            del self.cells[cell]
+
+    def move(self, element):
+        """Refile an element after its position changed"""
+        entry = self.located.get(element.id)
+        if entry is None:
+            return
+        old_cell, order = entry
+        cell = self._cell(element.x, element.y)
+        if cell != old_cell:
+            members = self.cells[old_cell]
+            del members[element.id]
+            if not members:
+                del self.cells[old_cell]
+            self.cells.setdefault(cell, {})[element.id] = element
+            self.located[element.id] = (cell, order)
+
+    def clear(self):
+        self.cells = {}
+        self.located = {}
+        self.next_order = 0
+        self.max_radius = 0
+
+    def rebuild(self, elements):
+        self.clear()
+        for element in elements:
+            self.insert(element)
+
+    def _candidates(self, x, y, reach):
+        # Elements whose centers lie in the cells within reach of (x, y)
+        first_column, first_row = self._cell(x - reach, y - reach)
+        last_column, last_row = self._cell(x + reach, y + reach)
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                members = self.cells.get((column, row))
+                if members:
+                    yield from members.values()
+
+    def near(self, pos, radius):
+        """Return the elements whose centers are within radius of pos"""
+        x, y = pos
+        limit = radius * radius
+        return [element for element in self._candidates(x, y, radius)
+                if (element.x - x) ** 2 + (element.y - y) ** 2 <= limit]
+
+    def pick(self, pos):
+        """Return the element under pos (the earliest added, like a scan of the element list), or None"""
+        best, best_order = None, None
+        for element in self._candidates(pos[0], pos[1], self.max_radius):
+            if element.is_over(pos):
+                order = self.located[element.id][1]
+                if best is None or order < best_order:
+                    best, best_order = element, order
+        return best
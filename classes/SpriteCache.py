@@ -0,0 +1,89 @@
+import math
+
+import pygame
+from collections import OrderedDict
+
+
+class SpriteCache:
+    """LRU cache of pre-rendered shape sprites
+
+    Each (shape, color, size, outline) combination is rasterized once onto a
+    per-pixel alpha Surface and then blitted. The least recently used sprites
+    are evicted once the cache holds more than max_bytes of pixel data.
+    """
+
+    def __init__(self, rasterize, extent=None, max_bytes=8 * 1024 * 1024):
+        # rasterize(surface, x, y, size, shape, color, outline) draws one shape centered at (x, y)
+        self.rasterize = rasterize
+        # extent(shape) is how far the shape reaches from its center, in units of size
+        self.extent = extent
+        self.max_bytes = max_bytes
+        self.sprites = OrderedDict()
+        self.bytes_used = 0
+
+        # Counters for profiling
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, shape, color, size, outline=True):
+        """Return the sprite for a shape; its center is at (half, half) where half = width // 2"""
+        key = (shape, tuple(color), size, outline)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        sprite = self._render(shape, color, size, outline)
+        self.sprites[key] = sprite
+        self.bytes_used += self._sprite_bytes(sprite)
+        self._evict()
+        return sprite
+
+    def blit(self, surface, x, y, size, shape, color, outline=True):
+        """Draw a shape centered at (x, y) using its cached sprite"""
+        if size <= 0:
+            return
+        sprite = self.get(shape, color, size, outline)
+        half = sprite.get_width() // 2
+        surface.blit(sprite, (int(x) - half, int(y) - half))
+
+    def clear(self):
+        self.sprites.clear()
+        self.bytes_used = 0
+
+    def stats(self):
+        """Return the cache counters as a dict"""
+        return {
+            'sprites': len(self.sprites),
+            'bytes': self.bytes_used,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+    def _render(self, shape, color, size, outline):
+        # Leave room for shapes that reach past their nominal size
+        reach = self.extent(shape) if self.extent else 1.3
+        half = math.ceil(size * reach) + 2
+        sprite = pygame.Surface((half * 2 + 1, half * 2 + 1), pygame.SRCALPHA)
+        self.rasterize(sprite, half, half, size, shape, color, outline)
+
+        # Match the display's pixel format for fast blits (only possible once a display exists)
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        return sprite
+
+    @staticmethod
+    def _sprite_bytes(sprite):
+        return sprite.get_width() * sprite.get_height() * sprite.get_bytesize()
+
+    def _evict(self):
+        # Always keep the sprite that was just added
+        while self.bytes_used > self.max_bytes and len(self.sprites) > 1:
+            _, sprite = self.sprites.popitem(last=False)
+            self.bytes_used -= self._sprite_bytes(sprite)
+            self.evictions += 1
@@ -0,0 +1,265 @@
+import numpy as np
+
+# Per-node attributes a pattern can carry besides the positions, with their array types
+NODE_ATTRIBUTES = {
+    'colors': np.uint8,             # (n, 3) RGB
+    'shapes': np.int16,             # Shape index (see ShapeRegistry)
+    'levels': np.int16,             # Evolution level
+    'love_logic_ratios': np.float32
+}
+
+
+def _frozen(values, dtype):
+    # Read-only array of the values; arrays that are already read-only are shared, not copied
+    array = np.asarray(values, dtype=dtype)
+    if array.flags.writeable:
+        if array is values:
+            array = array.copy()
+        array.setflags(write=False)
+    return array
+
+
+class StructurePattern:
+    """Immutable snapshot of a structure, drawn inside the elements of the next level
+
+    Positions, connections and per-node attributes live in read-only NumPy
+    arrays, and the bounds are computed once. Patterns are shared by reference
+    between elements; an element that changes its pattern gets a new one
+    (see with_head()), so its siblings and their render caches are unaffected.
+
+    For code written against the old dict patterns, pattern['positions'],
+    pattern.get('colors') and 'shapes' in pattern return the same data as
+    tuples.
+    """
+
+    __slots__ = ('positions', 'edges', 'colors', 'shapes', 'levels', 'love_logic_ratios',
+                 'count', 'min_x', 'min_y', 'max_x', 'max_y', 'center_x', 'center_y', 'width', 'height')
+
+    def __init__(self, positions, edges=None, colors=None, shapes=None, levels=None, love_logic_ratios=None):
+        # positions: (n, 2) node positions; edges: (m, 2) node index pairs, drawn in order.
+        # Attribute arrays may be shorter than the positions (missing nodes use the element's own values).
+        positions = _frozen(positions, np.float64).reshape(-1, 2)
+        edges = _frozen(edges if edges is not None else [], np.int32).reshape(-1, 2)
+        set_attribute = super().__setattr__
+        set_attribute('positions', positions)
+        set_attribute('edges', edges)
+        for name, values in (('colors', colors), ('shapes', shapes), ('levels', levels),
+                             ('love_logic_ratios', love_logic_ratios)):
+            if values is not None:
+                values = _frozen(values, NODE_ATTRIBUTES[name])
+                if name == 'colors':
+                    values = values.reshape(-1, 3)
+            set_attribute(name, values)
+
+        # Bounds of the positions, used to fit the pattern inside an element
+        count = len(positions)
+        set_attribute('count', count)
+        if count:
+            min_x, min_y = positions.min(axis=0).tolist()
+            max_x, max_y = positions.max(axis=0).tolist()
+        else:
+            min_x = min_y = max_x = max_y = 0.0
+        set_attribute('min_x', min_x)
+        set_attribute('min_y', min_y)
+        set_attribute('max_x', max_x)
+        set_attribute('max_y', max_y)
+        set_attribute('center_x', (min_x + max_x) / 2)
+        set_attribute('center_y', (min_y + max_y) / 2)
+        set_attribute('width', max(1, max_x - min_x))
+        set_attribute('height', max(1, max_y - min_y))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("StructurePattern is immutable - use with_head() or replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("StructurePattern is immutable")
+
+    def __reduce__(self):
+        return (StructurePattern, (self.positions, self.edges, self.colors, self.shapes, self.levels,
+                                   self.love_logic_ratios))
+
+    @classmethod
+    def from_dict(cls, pattern):
+        """Build a pattern from the old dict form; malformed connection entries are skipped"""
+        positions = [tuple(pos) for pos in pattern.get('positions') or []]
+        count = len(positions)
+
+        # Connections are (index, [targets]) entries, as tuples or lists
+        edges = []
+        for conn in pattern.get('connections') or []:
+            if not isinstance(conn, (tuple, list)) or len(conn) != 2:
+                continue
+            source, targets = conn
+            if not isinstance(targets, (tuple, list)) or not 0 <= source < count:
+                continue
+            edges.extend((source, target) for target in targets if 0 <= target < count)
+
+        return cls(positions, edges,
+                   **{name: pattern.get(name) for name in NODE_ATTRIBUTES})
+
+    @classmethod
+    def from_elements(cls, elements):
+        """Capture a list of elements: positions, connections and every node attribute"""
+        index = {e.id: i for i, e in enumerate(elements)}
+        edges = [(i, index[c.id]) for i, e in enumerate(elements) for c in e.connections if c.id in index]
+        return cls([(e.x, e.y) for e in elements], edges,
+                   colors=[e.color for e in elements],
+                   shapes=[e.shape for e in elements],
+                   levels=[e.level for e in elements],
+                   love_logic_ratios=[e.love_logic_ratio for e in elements])
+
+    def replace(self, **changes):
+        """Return a copy with some arrays replaced (positions, edges or node attributes)"""
+        fields = {name: getattr(self, name)
+                  for name in ('positions', 'edges', 'colors', 'shapes', 'levels', 'love_logic_ratios')}
+        fields.update(changes)
+        return StructurePattern(**fields)
+
+    def with_head(self, color=None, shape=None, level=None, love_logic_ratio=None):
+        """Return the pattern with its first node's attributes set (copy-on-write)
+
+        Only attributes the pattern carries are set, and the pattern itself is
+        returned if nothing changes.
+        """
+        changes = {}
+        for name, value in (('colors', color), ('shapes', shape), ('levels', level),
+                            ('love_logic_ratios', love_logic_ratio)):
+            current = getattr(self, name)
+            if value is None or current is None or len(current) == 0:
+                continue
+            if np.array_equal(current[0], np.asarray(value, dtype=current.dtype)):
+                continue
+            updated = current.copy()
+            updated[0] = value
+            changes[name] = updated
+        return self.replace(**changes) if changes else self
+
+    def with_midpoints(self, rng, count=3, jitter=10):
+        """Return the pattern with up to count new nodes between neighbouring nodes (picked with rng)
+
+        Each new node sits near the midpoint of nodes i and i + 1, is connected to
+        both, and inherits their attributes: the blended color and ratio, the
+        lower level and the shape of node i.
+        """
+        nodes = self.count
+        if nodes < 2:
+            return self
+
+        positions = self.positions.tolist()
+        edges = self.edges.tolist()
+        attributes = {name: getattr(self, name).tolist() for name in NODE_ATTRIBUTES
+                      if getattr(self, name) is not None}
+
+        for _ in range(min(count, nodes)):
+            idx1 = rng.randint(0, nodes - 1)
+            idx2 = (idx1 + 1) % nodes
+            (x1, y1), (x2, y2) = positions[idx1], positions[idx2]
+
+            new_idx = len(positions)
+            positions.append(((x1 + x2) / 2 + rng.uniform(-jitter, jitter),
+                              (y1 + y2) / 2 + rng.uniform(-jitter, jitter)))
+            edges.extend([(idx1, new_idx), (idx2, new_idx), (new_idx, idx1), (new_idx, idx2)])
+
+            for name, values in attributes.items():
+                # Attributes that don't cover every node stay partial
+                if len(values) != new_idx:
+                    continue
+                first, second = values[idx1], values[idx2]
+                if name == 'colors':
+                    values.append([(a + b) // 2 for a, b in zip(first, second)])
+                elif name == 'love_logic_ratios':
+                    values.append((first + second) / 2)
+                elif name == 'levels':
+                    values.append(min(first, second))
+                else:
+                    values.append(first)
+
+        return StructurePattern(positions, edges, **{name: attributes.get(name) for name in NODE_ATTRIBUTES})
+
+    def decimated(self, budget):
+        """Return the pattern reduced to at most budget nodes
+
+        The two closest nodes are merged, repeatedly: the later one is removed and
+        its connections move to the other, so the outline and connectivity of the
+        pattern survive. The first node (see with_head()) is never removed.
+        """
+        budget = max(1, budget)
+        if self.count <= budget:
+            return self
+
+        # Pairwise distances, each pair once (the later node of a pair is the one removed)
+        deltas = self.positions[:, None, :] - self.positions[None, :, :]
+        distances = np.hypot(deltas[..., 0], deltas[..., 1])
+        distances[np.tril_indices(self.count)] = np.inf
+
+        alive = np.ones(self.count, dtype=bool)
+        merged_into = {}
+        for _ in range(self.count - budget):
+            keep, remove = np.unravel_index(np.argmin(distances), distances.shape)
+            merged_into[int(remove)] = int(keep)
+            alive[remove] = False
+            distances[remove, :] = np.inf
+            distances[:, remove] = np.inf
+
+        def survivor(i):
+            while i in merged_into:
+                i = merged_into[i]
+            return i
+
+        # Redirect connections to the surviving nodes, dropping loops and repeats
+        survivors = np.flatnonzero(alive)
+        new_index = {int(old): new for new, old in enumerate(survivors)}
+        edges = []
+        seen = set()
+        for source, target in self.edges.tolist():
+            edge = (new_index[survivor(source)], new_index[survivor(target)])
+            if edge[0] != edge[1] and edge not in seen:
+                seen.add(edge)
+                edges.append(edge)
+
+        # Attributes that only cover the first nodes keep covering the surviving ones
+        attributes = {}
+        for name in NODE_ATTRIBUTES:
+            values = getattr(self, name)
+            if values is not None:
+                values = values[survivors[survivors < len(values)]]
+            attributes[name] = values
+
+        return StructurePattern(self.positions[survivors], edges, **attributes)
+
+    def node_attribute(self, name, i, default):
+        """Return a node's attribute as a plain Python value, or default if the pattern lacks it"""
+        values = getattr(self, name)
+        if values is None or i >= len(values):
+            return default
+        value = values[i].tolist()
+        return tuple(value) if isinstance(value, list) else value
+
+    # Read-only mapping view in the old dict form
+    def keys(self):
+        return ['positions', 'connections'] + [name for name in NODE_ATTRIBUTES if getattr(self, name) is not None]
+
+    def __contains__(self, name):
+        return name in self.keys()
+
+    def __getitem__(self, name):
+        if name == 'positions':
+            return tuple(map(tuple, self.positions.tolist()))
+        if name == 'connections':
+            targets = [[] for _ in range(self.count)]
+            for source, target in self.edges.tolist():
+                targets[source].append(target)
+            return tuple((i, tuple(t)) for i, t in enumerate(targets))
+        if name in NODE_ATTRIBUTES and getattr(self, name) is not None:
+            values = getattr(self, name).tolist()
+            return tuple(tuple(v) for v in values) if name == 'colors' else tuple(values)
+        raise KeyError(name)
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        return f"StructurePattern({self.count} nodes, {len(self.edges)} connections)"
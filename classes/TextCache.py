@@ -0,0 +1,64 @@
+import pygame
+from collections import OrderedDict
+
+
+class TextCache:
+    """Shared font registry and bounded cache of rendered text
+
+    font() looks each system font up once instead of on every frame, and
+    render() only rasterizes a (font, text, antialias, color) combination the
+    first time it is drawn. The returned surfaces are shared, so callers must
+    not draw on them.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.texts = OrderedDict()
+
+        # Counters for profiling
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, name, size, bold=False, italic=False):
+        """Return the pygame.font.SysFont for these settings, creating it on first use"""
+        key = (name, size, bold, italic)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size, bold=bold, italic=italic)
+            self.fonts[key] = font
+        return font
+
+    def render(self, font, text, antialias, color, background=None):
+        """Same as font.render(), but reuses the surface while the text stays the same"""
+        key = (font, text, antialias, tuple(color), tuple(background) if background else None)
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.texts.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color, background)
+        self.texts[key] = surface
+
+        # Forget the least recently drawn text (old scores, hints...)
+        while len(self.texts) > self.max_entries:
+            self.texts.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.texts.clear()
+
+    def stats(self):
+        """Return the cache counters as a dict"""
+        return {
+            'fonts': len(self.fonts),
+            'texts': len(self.texts),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+# Cache shared by all UI code
+text_cache = TextCache()
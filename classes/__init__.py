@@ -1,6 +1,21 @@
 # This file makes the classes directory a Python package
 from .Button import Button
+from .StructurePattern import StructurePattern
+from .ElementModel import ElementModel
+from .ElementView import ElementView
 from .Element import Element
 from .FractalStructure import FractalStructure
+from .HarmonyEngine import HarmonyEngine
+from .BatchHarmonyEvaluator import BatchHarmonyEvaluator
+from .HarmonySolver import HarmonySolver
+from .DifficultySimulator import DifficultySimulator
+from .SpriteCache import SpriteCache
+from .ShapeRegistry import ShapeRegistry
+from .DirtyRectRenderer import DirtyRectRenderer
+from .TextCache import TextCache
+from .ParticlePool import ParticlePool
+from .ScriptedInput import ScriptedInput
+from .PngWriter import PngWriter
+from .FractalExporter import FractalExporter
 
-__all__ = ['Button', 'Element', 'FractalStructure']
+__all__ = ['Button', 'StructurePattern', 'ElementModel', 'ElementView', 'Element', 'FractalStructure', 'HarmonyEngine', 'BatchHarmonyEvaluator', 'HarmonySolver', 'DifficultySimulator', 'SpriteCache', 'ShapeRegistry', 'DirtyRectRenderer', 'TextCache', 'ParticlePool', 'ScriptedInput', 'PngWriter', 'FractalExporter']